@@ -0,0 +1,124 @@
+"""Benchmark: subtitle cleaning throughput (lines/sec) with a golden-output check.
+
+Builds a deterministic corpus that mixes VTT, SRT and plain caption text with
+the edge cases the cleaner handles (cue numbers, timestamps, headers, tags,
+entities, unicode digits, separators and duplicates). It checks that
+clean_subtitles output is byte-identical to the original implementation, kept
+below as legacy_clean_subtitles, then reports lines/sec for both and for
+streaming iter_clean_lines over a file.
+
+Usage:
+    python benchmarks/bench_clean_subtitles.py [--lines 200000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ebs_pipeline_core import clean_subtitles, iter_clean_lines  # noqa: E402
+
+EDGE_CASES = [
+    "", "--", " -- ", "WEBVTT", "WEBVTT Kind: captions", "NOTE this is a note", "NOTEWORTHY line",
+    "1", "42", "٣٤", "12a", "00:00:01.000 --> 00:00:04.000", "00:00:01,000 --> 00:00:04,000",
+    "0:00:01.000 --> 0:00:04.000", "<c>hello</c> world", "<00:00:01.500><c> auto</c>", "&amp; &nbsp;",
+    "&am<b>p; survives", "Tom &amp; Jerry", "<i></i>", "&lt;&gt;", "  padded line  ", "dup", "dup",
+    "<b>dup</b>", "x < y > z", "&#39; numeric entity", "café ☕", " separator", "tab\tinside",
+]
+
+
+def legacy_clean_subtitles(subtitle_content):
+    """The pre-rewrite implementation, kept verbatim as the golden reference"""
+    if not subtitle_content:
+        return "No subtitle content available"
+    out = []
+    for line in subtitle_content.splitlines():
+        line = line.strip()
+        if (not re.match(r'^\d+$', line)
+                and not re.match(r'^\d{2}:\d{2}:\d{2}', line)
+                and not re.match(r'^(WEBVTT|NOTE)', line)
+                and line and line != '--'):
+            line = re.sub(r'<[^>]+>', '', line)
+            line = re.sub(r'&[a-zA-Z]+;', '', line)
+            if line and (not out or out[-1] != line):
+                out.append(line)
+    return "\n".join(out) or "Unable to extract subtitle content"
+
+
+def make_corpus(lines: int, seed: int = 1234) -> str:
+    rng = random.Random(seed)
+    words = "the a quick brown fox jumps over lazy dog we are going to talk about captions today".split()
+    out = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    cue = 0
+    while len(out) < lines:
+        cue += 1
+        start = cue * 2
+        out.append(str(cue))
+        out.append(f"00:{start // 60 % 60:02d}:{start % 60:02d}.000 --> 00:{(start + 2) // 60 % 60:02d}:"
+                   f"{(start + 2) % 60:02d}.000 align:start position:0%")
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(3, 10)))
+        kind = rng.random()
+        if kind < 0.3:
+            text = f"<00:00:{start % 60:02d}.120><c> {text}</c>"
+        elif kind < 0.4:
+            text = text.replace(" ", " &amp; ", 1)
+        out.append(text)
+        if rng.random() < 0.3:
+            out.append(text)  # rolling auto-caption duplicate
+        if rng.random() < 0.05:
+            out.append(rng.choice(EDGE_CASES))
+        out.append("")
+    return "\n".join(out[:lines])
+
+
+def rate(fn, content: str, lines: int, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - t0)
+    return lines / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    golden_inputs = ["\n".join(EDGE_CASES), "\r\n".join(EDGE_CASES), "", "\n\n", "1\n2\n--",
+                     make_corpus(5000, seed=7)] + EDGE_CASES
+    for text in golden_inputs:
+        expected, actual = legacy_clean_subtitles(text), clean_subtitles(text)
+        if expected != actual:
+            sys.exit(f"Output mismatch for input {text[:60]!r}:\n{expected[:200]!r}\n!=\n{actual[:200]!r}")
+    corpus = make_corpus(args.lines)
+    if legacy_clean_subtitles(corpus) != clean_subtitles(corpus):
+        sys.exit("Output mismatch on the benchmark corpus")
+    print(f"golden check: {len(golden_inputs) + 1} inputs byte-identical")
+
+    legacy = rate(legacy_clean_subtitles, corpus, args.lines, args.repeat)
+    current = rate(clean_subtitles, corpus, args.lines, args.repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'captions.vtt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(corpus)
+
+        def from_file(_):
+            with open(path, encoding='utf-8') as f:
+                for _ in iter_clean_lines(f):
+                    pass
+
+        streaming = rate(from_file, corpus, args.lines, args.repeat)
+
+    print(f"{'legacy clean_subtitles':<28} {legacy:>12,.0f} lines/s")
+    print(f"{'clean_subtitles':<28} {current:>12,.0f} lines/s  ({current / legacy:.1f}x)")
+    print(f"{'iter_clean_lines (file)':<28} {streaming:>12,.0f} lines/s")
+
+
+if __name__ == '__main__':
+    main()
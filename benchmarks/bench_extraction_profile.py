@@ -0,0 +1,140 @@
+"""Benchmark: HTTP requests and wall time per video, captions-only vs full extraction.
+
+Runs get_video_info for the same videos with the 'captions' profile (one
+player client, no DASH/HLS manifests, no format processing) and the 'video'
+profile (yt-dlp defaults, every format resolved). Requests are counted at
+YoutubeDL.urlopen, which every extractor request goes through. Subtitle
+track downloads go through our own HTTP client and do the same work for
+both, so they are left out of the counts and of the timed 'extract' stage.
+Each profile has its own warm session, and the order alternates per video
+so neither profile always hits a cold connection. --check-languages also
+verifies that both profiles list the same caption languages. Include a
+playlist-context URL (watch?v=...&list=...) in the list: both profiles must
+resolve it to the video itself.
+
+Needs yt-dlp and network access, and talks to YouTube for real: keep the
+list short and the --sleep polite.
+
+Usage:
+    python benchmarks/bench_extraction_profile.py URL [URL ...] [-f urls.txt] [--cookies cookies.txt]
+        [--lang en] [--rounds 1] [--sleep 5] [--check-languages]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ebs_pipeline_core import (  # noqa: E402
+    YTDLP_AVAILABLE,
+    RunStats,
+    YoutubeDLSession,
+    extract_video_metadata,
+    get_video_info,
+    load_yt_dlp,
+    read_urls_from_file,
+)
+
+PROFILES = ('captions', 'video')
+
+
+def counting_factory(counter: Dict[str, int]):
+    """YoutubeDL factory whose instances count every request the extractors make"""
+    yt_dlp = load_yt_dlp()
+
+    def factory(opts: Dict[str, Any]):
+        ydl = yt_dlp.YoutubeDL(opts)
+        urlopen = ydl.urlopen
+
+        def counted(req):
+            counter['requests'] += 1
+            return urlopen(req)
+
+        ydl.urlopen = counted
+        return ydl
+
+    return factory
+
+
+def caption_languages(ydl_session: YoutubeDLSession, url: str, profile: str, lang: str,
+                      cookie_file_path: Optional[str]) -> List[str]:
+    # get_video_info only reports what it downloaded, so list the tracks directly (resolved the same way)
+    info = extract_video_metadata(ydl_session.get(lang, cookie_file_path, profile=profile), url, profile)
+    return sorted(set(info.get('subtitles') or {}) | set(info.get('automatic_captions') or {}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('urls', nargs='*', help="YouTube video URLs")
+    parser.add_argument('-f', '--urls-file', help=".txt file with one URL per line")
+    parser.add_argument('--cookies', help="Netscape cookie file")
+    parser.add_argument('--lang', default='en')
+    parser.add_argument('--rounds', type=int, default=1, help="passes over the URL list")
+    parser.add_argument('--sleep', type=float, default=5.0, help="seconds between extractions")
+    parser.add_argument('--check-languages', action='store_true',
+                        help="extract once more per profile and compare the listed caption languages")
+    args = parser.parse_args()
+
+    if not YTDLP_AVAILABLE:
+        sys.exit("yt-dlp is not installed; nothing to measure.")
+    urls = list(args.urls)
+    if args.urls_file:
+        urls += read_urls_from_file(args.urls_file, lambda message, color=None: print(message)) or []
+    if not urls:
+        sys.exit("No URLs given.")
+
+    counters = {profile: {'requests': 0} for profile in PROFILES}
+    sessions = {profile: YoutubeDLSession(counting_factory(counters[profile])) for profile in PROFILES}
+    results: Dict[str, Dict[str, List[float]]] = {p: {'requests': [], 'ms': [], 'failed': []} for p in PROFILES}
+
+    def log(message, color=None):
+        if color == 'red':
+            print(f"  {message}")
+
+    for round_no in range(args.rounds):
+        for n, url in enumerate(urls):
+            order = PROFILES if (n + round_no) % 2 == 0 else PROFILES[::-1]
+            for profile in order:
+                stats = RunStats()
+                before = counters[profile]['requests']
+                r = get_video_info(url, log, args.lang, args.cookies, session=sessions[profile],
+                                   stats=stats, profile=profile)
+                results[profile]['requests'].append(counters[profile]['requests'] - before)
+                results[profile]['ms'].append(stats.stage_seconds['extract'] * 1e3)
+                results[profile]['failed'].append(float(r.get('status') != 'success'))
+                time.sleep(args.sleep)
+
+    print(f"{len(urls)} videos x {args.rounds} round(s)")
+    for profile in PROFILES:
+        res = results[profile]
+        print(f"{profile:<9} requests/video {statistics.mean(res['requests']):6.2f}   "
+              f"extract p50 {statistics.median(res['ms']):8.1f} ms   mean {statistics.mean(res['ms']):8.1f} ms   "
+              f"failed {int(sum(res['failed']))}")
+    captions, full = (statistics.mean(results[p]['ms']) for p in PROFILES)
+    print(f"captions-only saves {full - captions:.1f} ms/video ({1 - captions / full:.0%}) and "
+          f"{statistics.mean(results['video']['requests']) - statistics.mean(results['captions']['requests']):.2f} "
+          f"requests/video")
+
+    if args.check_languages:
+        mismatches = 0
+        for url in urls:
+            listed = {}
+            for profile in PROFILES:
+                listed[profile] = caption_languages(sessions[profile], url, profile, args.lang, args.cookies)
+                time.sleep(args.sleep)
+            if listed['captions'] != listed['video']:
+                mismatches += 1
+                only_full = sorted(set(listed['video']) - set(listed['captions']))
+                only_captions = sorted(set(listed['captions']) - set(listed['video']))
+                print(f"  {url}: only in full {only_full[:10]}, only in captions-only {only_captions[:10]}")
+        print(f"caption language listings differ for {mismatches}/{len(urls)} videos")
+
+    for session in sessions.values():
+        session.close()
+
+
+if __name__ == '__main__':
+    main()
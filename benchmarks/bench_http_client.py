@@ -0,0 +1,125 @@
+"""Benchmark: per-track subtitle download latency against a local HTTP server.
+
+Compares the legacy path (a fresh urllib.request.urlopen connection per
+track) with the pooled keep-alive SubtitleHTTPClient, sequentially and through
+its asyncio batch variant. The server can add a per-connection setup delay to
+stand in for the TCP+TLS handshake that the pooled client avoids.
+
+Usage:
+    python benchmarks/bench_http_client.py [--tracks 200] [--handshake-ms 30] [--payload-kb 200]
+"""
+import argparse
+import asyncio
+import gzip
+import http.server
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ebs_pipeline_core import SubtitleHTTPClient  # noqa: E402
+
+
+def make_payload(kb: int) -> bytes:
+    events = []
+    i = 0
+    while len(json.dumps(events)) < kb * 1024:
+        events.append({"tStartMs": i * 1000, "dDurationMs": 1000,
+                       "segs": [{"utf8": f"caption line number {i} with some words"}]})
+        i += 1
+    return json.dumps({"events": events}).encode('utf-8')
+
+
+def start_server(payload: bytes, handshake_s: float):
+    gz_payload = gzip.compress(payload)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            time.sleep(handshake_s)
+            super().setup()
+
+        def do_GET(self):
+            use_gzip = 'gzip' in (self.headers.get('Accept-Encoding') or '')
+            body = gz_payload if use_gzip else payload
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(fetch, urls):
+    latencies = []
+    for url in urls:
+        t0 = time.perf_counter()
+        fetch(url)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def report(name: str, latencies, wall: float):
+    ms = sorted(x * 1e3 for x in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{name:<24} {statistics.mean(ms):>9.2f} {statistics.median(ms):>9.2f} {p95:>9.2f} "
+          f"{len(ms) / wall:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tracks', type=int, default=200)
+    parser.add_argument('--handshake-ms', type=float, default=30.0,
+                        help="simulated connection setup cost per new connection")
+    parser.add_argument('--payload-kb', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    payload = make_payload(args.payload_kb)
+    server = start_server(payload, args.handshake_ms / 1e3)
+    base = f"http://127.0.0.1:{server.server_address[1]}/api/timedtext?v="
+    urls = [f"{base}{i:011d}&fmt=json3" for i in range(args.tracks)]
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    print(f"{args.tracks} tracks, {len(payload) / 1024:.0f} KB payload, {args.handshake_ms:.0f} ms handshake")
+    print(f"{'path':<24} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'tracks/s':>10}")
+
+    def legacy(url):
+        with opener.open(url) as resp:
+            return resp.read()
+
+    t0 = time.perf_counter()
+    report("urlopen per track", timed(legacy, urls), time.perf_counter() - t0)
+
+    client = SubtitleHTTPClient()
+    t0 = time.perf_counter()
+    report("pooled keep-alive", timed(client.fetch, urls), time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    bodies = asyncio.run(client.fetch_many_async(urls, concurrency=args.concurrency))
+    wall = time.perf_counter() - t0
+    assert all(body == payload for body in bodies)
+    print(f"{'pooled async x' + str(args.concurrency):<24} {'':>9} {'':>9} {'':>9} {len(urls) / wall:>10.1f}")
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+"""Benchmark: the whole pipeline offline, against a local stand-in for YouTube.
+
+FakeYoutubeDL replaces yt_dlp.YoutubeDL through the YoutubeDLSession factory
+and returns info dicts shaped like real extract_info output ('subtitles' and
+'automatic_captions' with json3 and vtt tracks), optionally cloned from a
+recorded `yt-dlp -J` fixture. The track URLs point at a local HTTP server
+that can add latency and answer a fraction of requests with HTTP 429.
+
+A batch runs twice through PipelineEngine (extraction, subtitle download and
+cleaning, results journal, file writer): once cold and once warm against the
+cold pass's journal. Each pass runs in its own subprocess, so peak RSS is per
+pass and the warm pass sees the cache the way a restarted app does: a
+cleaner fingerprint that differs between the two processes, or a warm pass
+that does not resume the cold pass's checkpoint, re-cleans or re-commits
+results, is reported as a failure. It reports
+throughput, per-video latency percentiles, stage shares and peak memory. get_video_info, get_subtitles, clean_subtitles,
+ResultsStore.commit and write_video_outputs are also timed on their own.
+
+Usage:
+    python benchmarks/bench_offline_pipeline.py [--sizes 10 100 1000 10000] [--workers 4]
+        [--latency-ms 20] [--error-rate 0.01] [--extract-ms 0] [--cues 400] [--fixture info.json]
+
+Sizes up to 100000 work; each video writes a folder with two files per pass.
+"""
+import argparse
+import copy
+import gzip
+import http.server
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ebs_pipeline_core import (  # noqa: E402
+    PipelineConfig,
+    PipelineEngine,
+    ResultsStore,
+    SubtitleHTTPClient,
+    clean_subtitles,
+    cleaner_version,
+    default_ydl_session,
+    get_subtitles,
+    get_video_info,
+    subtitle_payload_to_text,
+    write_video_outputs,
+)
+
+OTHER_LANGS = ('de', 'es', 'fr', 'ja', 'ko', 'pt', 'ru', 'vi')
+
+
+# ====== Local subtitle server ======
+def make_payloads(cues: int) -> Dict[str, bytes]:
+    events = [{"tStartMs": i * 2000, "dDurationMs": 2000,
+               "segs": [{"utf8": f"caption line {i} "}, {"utf8": "with <b>some</b> words &amp; more"}]}
+              for i in range(cues)]
+    vtt = ["WEBVTT", ""]
+    for i in range(cues):
+        vtt += [f"00:{i * 2 // 60 % 60:02d}:{i * 2 % 60:02d}.000 --> 00:{(i * 2 + 2) // 60 % 60:02d}:"
+                f"{(i * 2 + 2) % 60:02d}.000 align:start position:0%",
+                f"caption line {i} with <c>some</c> words &amp; more", ""]
+    return {'json3': json.dumps({"events": events}).encode('utf-8'),
+            'vtt': "\n".join(vtt).encode('utf-8')}
+
+
+def start_server(payloads: Dict[str, bytes], latency_s: float, error_rate: float, seed: int):
+    gz_payloads = {fmt: gzip.compress(body) for fmt, body in payloads.items()}
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    counts = {'requests': 0, 'throttled': 0}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if latency_s:
+                time.sleep(latency_s)
+            with lock:
+                counts['requests'] += 1
+                throttle = rng.random() < error_rate
+                counts['throttled'] += int(throttle)
+            if throttle:
+                body = b"Too Many Requests"
+                self.send_response(429)
+                self.send_header('Retry-After', '1')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            fmt = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query).get('fmt', ['json3'])[0]
+            use_gzip = 'gzip' in (self.headers.get('Accept-Encoding') or '')
+            body = (gz_payloads if use_gzip else payloads).get(fmt, payloads['json3'])
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json' if fmt == 'json3' else 'text/vtt')
+            self.send_header('Content-Length', str(len(body)))
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counts
+
+
+# ====== Fake extractor ======
+def track_list(base: str, video_id: str, lang: str, kind: str) -> List[Dict[str, Any]]:
+    return [{'ext': fmt, 'name': f"{lang} ({kind})",
+             'url': f"{base}/api/timedtext?v={video_id}&lang={lang}&kind={kind}&fmt={fmt}"}
+            for fmt in ('json3', 'vtt')]
+
+
+def synthetic_info(base: str, video_id: str, n: int) -> Dict[str, Any]:
+    auto = {lang: track_list(base, video_id, lang, 'asr') for lang in ('en',) + OTHER_LANGS}
+    info = {'id': video_id, 'title': f"Benchmark video {n}", 'webpage_url': f"https://youtu.be/{video_id}",
+            'duration': 600, 'subtitles': {}, 'automatic_captions': auto}
+    if n % 3 == 0:
+        info['subtitles'] = {'en': track_list(base, video_id, 'en', 'manual')}
+    return info
+
+
+def fixture_info(fixture: Dict[str, Any], base: str, video_id: str) -> Dict[str, Any]:
+    """A recorded info dict with the video ID swapped and every track URL pointed at the local server"""
+    info = copy.deepcopy(fixture)
+    info['id'] = video_id
+    for key, kind in (('subtitles', 'manual'), ('automatic_captions', 'asr')):
+        for lang, tracks in (info.get(key) or {}).items():
+            for track in tracks:
+                track['url'] = f"{base}/api/timedtext?v={video_id}&lang={lang}&kind={kind}&fmt={track.get('ext')}"
+    return info
+
+
+class FakeYoutubeDL:
+    """Just enough of yt_dlp.YoutubeDL for get_video_info"""
+
+    def __init__(self, ydl_opts: Dict[str, Any], base: str, extract_s: float,
+                 fixture: Optional[Dict[str, Any]] = None):
+        self.params = ydl_opts
+        self.base = base
+        self.extract_s = extract_s
+        self.fixture = fixture
+
+    def extract_info(self, url: str, download: bool = False, process: bool = True) -> Dict[str, Any]:
+        if self.extract_s:
+            time.sleep(self.extract_s)
+        video_id = url[-11:]
+        if self.fixture is not None:
+            return fixture_info(self.fixture, self.base, video_id)
+        return synthetic_info(self.base, video_id, int(video_id[1:]) if video_id[1:].isdigit() else 0)
+
+    def close(self):
+        pass
+
+
+def video_urls(count: int) -> List[str]:
+    return [f"https://www.youtube.com/watch?v=b{i:010d}" for i in range(count)]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+# ====== One pass (child process) ======
+def journal_lines(path: str) -> int:
+    try:
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+    except OSError:
+        return 0
+
+
+def run_pass(size: int, label: str, workdir: str, args: argparse.Namespace,
+             fixture: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    server, counts = start_server(make_payloads(args.cues), args.latency_ms / 1e3, args.error_rate, args.seed)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    session = default_ydl_session()
+    session.factory = lambda opts: FakeYoutubeDL(opts, base, args.extract_ms / 1e3, fixture)
+    config = PipelineConfig(urls=video_urls(size), dest_dir=os.path.join(workdir, 'out'),
+                            results_path=os.path.join(workdir, 'results.jsonl'),
+                            subtitle_cache_dir=os.path.join(workdir, 'subtitle_cache'),
+                            run_summary_dir=None, rate_limit_enabled=False, num_workers=args.workers)
+    started: Dict[str, float] = {}
+    latencies: List[float] = []
+    recleaned = [0]
+    resumed = [0]
+
+    def on_status(url: str, status: str):
+        if status in ('running', 'cached'):
+            started.setdefault(url, time.perf_counter())
+
+    def on_video(event: Dict[str, Any]):
+        resumed[0] += int(bool(event.get('resumed')))
+        begin = started.get(event['url'])
+        if begin is not None:
+            latencies.append(time.perf_counter() - begin)
+
+    def log(message: str, color: Optional[str] = None):
+        if message.startswith('↷ Re-cleaned'):
+            recleaned[0] += 1
+
+    t0 = time.perf_counter()
+    summary = PipelineEngine(config, log, video_func=on_video, status_func=on_status).run()
+    wall = time.perf_counter() - t0
+    server.shutdown()
+    latencies.sort()
+    stats = summary['stats']
+    stage_total = sum(stats['stage_seconds'].values()) or 1.0
+    return {
+        'pass': label, 'videos': summary['processed'], 'wall_s': wall,
+        'videos_per_s': summary['processed'] / wall if wall else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1e3, 'p90_ms': percentile(latencies, 0.90) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+        'cache_hit_ratio': stats['cache_hit_ratio'], 'errors': stats['errors'],
+        'http_requests': counts['requests'],
+        'stage_share': {k: v / stage_total for k, v in stats['stage_seconds'].items() if v},
+        'throttled': counts['throttled'], 'peak_rss_mb': peak_rss_mb(),
+        'cleaner': cleaner_version(), 'recleaned': recleaned[0],
+        'journal_lines': journal_lines(config.results_path),
+        'saved': summary['saved'], 'resumed': resumed[0], 'checkpoint': os.path.basename(summary['checkpoint']),
+    }
+
+
+def cross_process_problems(cold: Dict[str, Any], warm: Dict[str, Any]) -> List[str]:
+    """What a restarted process redid that it should have reused"""
+    problems = []
+    if cold['cleaner'] != warm['cleaner']:
+        problems.append(f"cleaner fingerprint differs between processes ({cold['cleaner']} vs {warm['cleaner']})")
+    if warm['recleaned']:
+        problems.append(f"warm pass re-cleaned {warm['recleaned']} cached results")
+    if warm['checkpoint'] != cold['checkpoint']:
+        problems.append(f"warm pass opened a new checkpoint ({warm['checkpoint']}, cold wrote {cold['checkpoint']})")
+    elif warm['resumed'] != cold['saved']:
+        problems.append(f"warm pass resumed {warm['resumed']} of the {cold['saved']} videos the cold pass wrote")
+    if warm['journal_lines'] != cold['journal_lines']:
+        problems.append(f"warm pass grew the journal from {cold['journal_lines']} to {warm['journal_lines']} lines")
+    return problems
+
+
+# ====== Individual components ======
+def time_calls(func, items) -> List[float]:
+    out = []
+    for item in items:
+        t0 = time.perf_counter()
+        func(item)
+        out.append(time.perf_counter() - t0)
+    return sorted(out)
+
+
+def run_components(args: argparse.Namespace, fixture: Optional[Dict[str, Any]], samples: int = 200):
+    payloads = make_payloads(args.cues)
+    server, _ = start_server(payloads, args.latency_ms / 1e3, 0.0, args.seed)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    session = default_ydl_session()
+    session.factory = lambda opts: FakeYoutubeDL(opts, base, args.extract_ms / 1e3, fixture)
+    client = SubtitleHTTPClient()
+    urls = video_urls(samples)
+    fake = FakeYoutubeDL({}, base, 0.0, fixture)
+    infos = [fake.extract_info(url) for url in urls]
+    raw_text = subtitle_payload_to_text(payloads['json3'], 'json3')
+    results = [get_video_info(url, lambda message, color=None: None) for url in urls[:10]]
+    log = lambda message, color=None: None  # noqa: E731
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(os.path.join(tmp, 'results.jsonl'))
+        rows.append(('get_video_info', time_calls(lambda url: get_video_info(url, log), urls)))
+        rows.append(('get_subtitles', time_calls(lambda info: get_subtitles(info, 'en', client), infos)))
+        rows.append(('clean_subtitles', time_calls(lambda _: clean_subtitles(raw_text), range(samples))))
+        rows.append(('ResultsStore.commit', time_calls(
+            lambda n: store.commit(dict(results[n % len(results)], video_id=f"c{n:010d}")), range(samples))))
+        rows.append(('write_video_outputs', time_calls(
+            lambda n: write_video_outputs(results[n % len(results)], n + 1, 6, os.path.join(tmp, 'out'),
+                                          "Ebs-", "bcl-", "Content-", 'en', False, log), range(samples))))
+        store.close()
+    client.close()
+    server.shutdown()
+
+    print(f"\nComponents ({samples} calls each, {args.latency_ms:.0f} ms server latency):")
+    print(f"{'component':<22} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'calls/s':>10}")
+    for name, latencies in rows:
+        total = sum(latencies)
+        print(f"{name:<22} {percentile(latencies, 0.5) * 1e3:>9.3f} {percentile(latencies, 0.9) * 1e3:>9.3f} "
+              f"{percentile(latencies, 0.99) * 1e3:>9.3f} {len(latencies) / total if total else 0:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="server delay per subtitle request")
+    parser.add_argument('--error-rate', type=float, default=0.01, help="fraction of requests answered with 429")
+    parser.add_argument('--extract-ms', type=float, default=0.0, help="simulated extract_info time per video")
+    parser.add_argument('--cues', type=int, default=400, help="caption cues per subtitle payload")
+    parser.add_argument('--fixture', help="recorded info dict (yt-dlp -J output) to clone for every video")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-components', action='store_true', help="skip the per-component timings")
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--child-pass', help=argparse.SUPPRESS)
+    parser.add_argument('--child-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    fixture = None
+    if args.fixture:
+        with open(args.fixture, 'r', encoding='utf-8') as f:
+            fixture = json.load(f)
+
+    if args.child is not None:
+        print(json.dumps(run_pass(args.child, args.child_pass, args.child_dir, args, fixture)))
+        return
+
+    print(f"workers={args.workers} latency={args.latency_ms:.0f}ms 429-rate={args.error_rate:.1%} "
+          f"extract={args.extract_ms:.0f}ms cues={args.cues}" + (f" fixture={args.fixture}" if fixture else ""))
+    print(f"{'videos':>7} {'pass':<5} {'videos/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'hits':>5} {'errs':>5} {'http':>6} {'peak MB':>8}  top stages")
+    failed = False
+    for size in args.sizes:
+        passes = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for label in ('cold', 'warm'):
+                proc = subprocess.run([sys.executable, os.path.abspath(__file__)] + sys.argv[1:]
+                                      + ['--child', str(size), '--child-pass', label, '--child-dir', tmp],
+                                      stdout=subprocess.PIPE, universal_newlines=True)
+                if proc.returncode != 0:
+                    print(f"{size:>7} {label:<5} failed (exit {proc.returncode})")
+                    break
+                passes.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        for p in passes:
+            stages = sorted(p['stage_share'].items(), key=lambda kv: -kv[1])[:3]
+            peak = p['peak_rss_mb']
+            print(f"{size:>7} {p['pass']:<5} {p['videos_per_s']:>9.1f} {p['p50_ms']:>8.2f} {p['p90_ms']:>8.2f} "
+                  f"{p['p99_ms']:>8.2f} {p['cache_hit_ratio']:>5.0%} {p['errors']:>5} {p['http_requests']:>6} "
+                  f"{(f'{peak:.0f}' if peak is not None else 'n/a'):>8}  "
+                  + ", ".join(f"{k} {v:.0%}" for k, v in stages))
+        if len(passes) == 2:
+            for problem in cross_process_problems(*passes):
+                failed = True
+                print(f"{size:>7} FAIL  {problem}")
+
+    if not args.no_components:
+        run_components(args, fixture)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
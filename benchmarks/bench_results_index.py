@@ -0,0 +1,87 @@
+"""Benchmark: cache lookup cost against a growing youtube_results.json history.
+
+Compares the old per-URL lookup (re-parsing the results file with
+load_existing_index for every video) with the ResultsStore journal, which is
+opened once per run and commits each finished video with a single append.
+
+Usage:
+    python benchmarks/bench_results_index.py [--sizes 1000 5000 20000] [--lookups 200]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ebs_pipeline_core import ResultsStore, load_existing_index  # noqa: E402
+
+
+def make_history(path: str, size: int, text_len: int):
+    line = "the quick brown fox jumps over the lazy dog " * (text_len // 44 + 1)
+    items = []
+    for i in range(size):
+        vid = f"v{i:010d}"
+        items.append({
+            'title': f"Video {i}",
+            'video_id': vid,
+            'url': f"https://www.youtube.com/watch?v={vid}",
+            'subtitles': line[:text_len],
+            'status': 'success',
+            'extracted_lang': 'en',
+        })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--lookups', type=int, default=200)
+    parser.add_argument('--text-len', type=int, default=2000, help="subtitle characters per history entry")
+    parser.add_argument('--legacy-lookups', type=int, default=5,
+                        help="lookups timed for the legacy path (each one re-parses the file)")
+    args = parser.parse_args()
+
+    print(f"{'history':>8} {'file MB':>8} {'legacy ms/lookup':>17} {'import ms':>10} {'open ms':>8} "
+          f"{'us/lookup':>10} {'ms/commit':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"results_{size}.json")
+            make_history(path, size, args.text_len)
+            keys = [f"v{random.randrange(size):010d}" for _ in range(args.lookups)]
+
+            t0 = time.perf_counter()
+            for vid in keys[:args.legacy_lookups]:
+                idx, _ = load_existing_index(path)
+                assert vid in idx
+            legacy = (time.perf_counter() - t0) / args.legacy_lookups
+
+            journal = os.path.join(tmp, f"results_{size}.jsonl")
+            t0 = time.perf_counter()
+            ResultsStore(journal, legacy_path=path).close()
+            imported = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            store = ResultsStore(journal, legacy_path=None)
+            opened = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for vid in keys:
+                assert store.get(vid) is not None
+            lookup = (time.perf_counter() - t0) / len(keys)
+
+            t0 = time.perf_counter()
+            for n in range(args.lookups):
+                store.commit({'video_id': f"new{n:08d}", 'status': 'success', 'subtitles': 'x' * args.text_len})
+            commit = (time.perf_counter() - t0) / args.lookups
+            store.close()
+
+            mb = os.path.getsize(path) / 1e6
+            print(f"{size:>8} {mb:>8.1f} {legacy * 1e3:>17.1f} {imported * 1e3:>10.1f} {opened * 1e3:>8.1f} "
+                  f"{lookup * 1e6:>10.2f} {commit * 1e3:>10.2f}")
+
+if __name__ == '__main__':
+    main()
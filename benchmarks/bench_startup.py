@@ -0,0 +1,84 @@
+"""Startup-time report: module import cost of the pipeline entry points.
+
+Runs each entry module in a fresh interpreter with `python -X importtime`,
+then prints the wall time, the total import time and the slowest imports
+(top level and their direct children). It also flags heavy modules (yt_dlp, customtkinter) that load where
+they should not: yt_dlp must stay lazy everywhere, and customtkinter must never
+load for the CLI. With --max-ms, the exit code is non-zero when a target goes
+over budget, so the script can gate a build.
+
+Usage:
+    python benchmarks/bench_startup.py [--top 10] [--max-ms 300] [--yt-dlp]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    # (label, code, modules that must not be imported)
+    ("core", "import ebs_pipeline_core", ("yt_dlp", "customtkinter")),
+    ("cli", "import ebs_pipeline_cli", ("yt_dlp", "customtkinter")),
+    ("gui", "import ebs_pipeline_gui", ("yt_dlp",)),
+]
+
+
+def import_profile(code: str):
+    """Returns (wall seconds, [(cumulative us, depth, module)] for depth <= 1, set of imported modules)"""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    top_level, modules = [], set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # "import time:   self_us |   cumulative_us | <indent>module", two spaces of indent per level
+        _, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.add(name.strip())
+        if depth <= 1:
+            top_level.append((int(cumulative_us), depth, name.strip()))
+    return wall, top_level, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=10, help="slowest imports (top level and one below) to list")
+    parser.add_argument('--max-ms', type=float, help="fail if any target's total import time exceeds this")
+    parser.add_argument('--yt-dlp', action='store_true', help="also time the deferred `import yt_dlp`")
+    args = parser.parse_args()
+
+    failed = False
+    targets = list(TARGETS)
+    if args.yt_dlp:
+        targets.append(("yt_dlp (deferred)", "import yt_dlp", ()))
+    for label, code, forbidden in targets:
+        try:
+            wall, top_level, modules = import_profile(code)
+        except RuntimeError as e:
+            print(f"\n[{label}] skipped: {e}")
+            continue
+        total_ms = sum(us for us, depth, _ in top_level if depth == 0) / 1e3
+        print(f"\n[{label}] wall {wall * 1e3:.0f} ms (incl. interpreter start), imports {total_ms:.0f} ms, "
+              f"{len(modules)} modules")
+        for us, depth, name in sorted(top_level, reverse=True)[:args.top]:
+            print(f"  {us / 1e3:8.1f} ms  {'  ' * depth}{name}")
+        leaked = [m for m in forbidden if m in modules]
+        if leaked:
+            failed = True
+            print(f"  REGRESSION: imported at startup: {', '.join(leaked)}")
+        if args.max_ms is not None and total_ms > args.max_ms:
+            failed = True
+            print(f"  REGRESSION: {total_ms:.0f} ms exceeds budget of {args.max_ms:.0f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
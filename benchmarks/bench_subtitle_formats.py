@@ -0,0 +1,106 @@
+"""Benchmark: bytes downloaded and parse time per subtitle format.
+
+Renders the same synthetic auto-caption track (word-timed cues, as YouTube
+serves them) as json3, srv3, srv2, srv1, TTML and rolling WebVTT. For each
+format it reports the payload size, raw and gzipped (the HTTP client requests
+gzip), and the parse_subtitle time. The formats are listed in the order
+select_subtitle_format prefers them.
+
+Usage:
+    python benchmarks/bench_subtitle_formats.py [--cues 20000] [--repeat 3]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ebs_pipeline_core import SUBTITLE_FORMAT_PREFERENCE, cues_to_text, parse_subtitle  # noqa: E402
+
+
+def make_cues(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    words = "so today we are going to look at how captions work and why it matters".split()
+    cues, t = [], 0
+    for _ in range(count):
+        n = rng.randint(4, 9)
+        cue_words = [(t + i * 300, rng.choice(words)) for i in range(n)]
+        cues.append((t, n * 300, cue_words))
+        t += n * 300
+    return cues
+
+
+def clock(ms: int) -> str:
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+
+def render(fmt: str, cues) -> bytes:
+    if fmt == 'json3':
+        events = []
+        for start, dur, words in cues:
+            segs = [{"utf8": (" " if i else "") + w, "tOffsetMs": ws - start} for i, (ws, w) in enumerate(words)]
+            events.append({"tStartMs": start, "dDurationMs": dur, "wWinId": 1, "segs": segs})
+            events.append({"tStartMs": start + dur, "wWinId": 1, "aAppend": 1, "segs": [{"utf8": "\n"}]})
+        return json.dumps({"wireMagic": "pb3", "events": events}).encode()
+    if fmt == 'srv3':
+        body = "".join(
+            f'<p t="{start}" d="{dur}" w="1">'
+            + "".join(f'<s t="{ws - start}" ac="0">{" " if i else ""}{escape(w)}</s>' for i, (ws, w) in
+                      enumerate(words)) + "</p>"
+            for start, dur, words in cues)
+        return f'<?xml version="1.0" encoding="utf-8" ?><timedtext format="3"><body>{body}</body></timedtext>'.encode()
+    if fmt == 'srv2':
+        body = "".join(f'<text t="{start}" d="{dur}">{escape(" ".join(w for _, w in words))}</text>'
+                       for start, dur, words in cues)
+        return f'<?xml version="1.0" encoding="utf-8" ?><timedtext>{body}</timedtext>'.encode()
+    if fmt == 'srv1':
+        body = "".join(f'<text start="{start / 1000}" dur="{dur / 1000}">{escape(" ".join(w for _, w in words))}</text>'
+                       for start, dur, words in cues)
+        return f'<?xml version="1.0" encoding="utf-8" ?><transcript>{body}</transcript>'.encode()
+    if fmt == 'ttml':
+        body = "".join(f'<p begin="{clock(start)}" end="{clock(start + dur)}">{escape(" ".join(w for _, w in words))}</p>'
+                       for start, dur, words in cues)
+        return (f'<?xml version="1.0" encoding="utf-8" ?><tt xmlns="http://www.w3.org/ns/ttml" xml:lang="en">'
+                f'<body><div>{body}</div></body></tt>').encode()
+    if fmt == 'vtt':
+        # YouTube auto-caption VTT: each cue repeats the previous line and word-times the new one
+        out = ["WEBVTT", "Kind: captions", "Language: en", ""]
+        prev = " "
+        for start, dur, words in cues:
+            timed = "".join(f"<{clock(ws)}><c> {w}</c>" if i else w for i, (ws, w) in enumerate(words))
+            out += [f"{clock(start)} --> {clock(start + dur)} align:start position:0%", prev, timed, "",
+                    f"{clock(start + dur - 10)} --> {clock(start + dur)} align:start position:0%", prev,
+                    " ".join(w for _, w in words), ""]
+            prev = " ".join(w for _, w in words)
+        return "\n".join(out).encode()
+    raise ValueError(fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cues', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cues = make_cues(args.cues)
+    print(f"{args.cues} cues (~{args.cues * 6.5 * 0.3 / 3600:.1f} h of speech)")
+    print(f"{'format':<7} {'raw KB':>9} {'gzip KB':>9} {'parse ms':>9} {'cues/s':>12} {'text KB':>8}")
+    for fmt in SUBTITLE_FORMAT_PREFERENCE:
+        payload = render(fmt, cues)
+        best = float('inf')
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            parsed = parse_subtitle(payload, fmt)
+            best = min(best, time.perf_counter() - t0)
+        text = cues_to_text(parsed)
+        print(f"{fmt:<7} {len(payload) / 1024:>9.0f} {len(gzip.compress(payload)) / 1024:>9.0f} "
+              f"{best * 1e3:>9.1f} {len(parsed) / best:>12,.0f} {len(text) / 1024:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Microbenchmark: per-video YoutubeDL overhead outside the network call.
+
+Compares building a fresh yt_dlp.YoutubeDL for every video (the old
+get_video_info behaviour) with reusing a warm instance from YoutubeDLSession.
+A synthetic Netscape cookie file is used so cookie-jar parsing is included.
+No network requests are made. Requires yt-dlp.
+
+Usage:
+    python benchmarks/bench_ydl_session.py [--videos 50] [--cookies 300]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ebs_pipeline_core import YTDLP_AVAILABLE, YoutubeDLSession, build_ydl_options  # noqa: E402
+
+
+def write_cookie_file(path: str, count: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Netscape HTTP Cookie File\n")
+        for i in range(count):
+            f.write(f".youtube.com\tTRUE\t/\tTRUE\t2147483647\tCOOKIE_{i}\t{'x' * 40}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--videos', type=int, default=50)
+    parser.add_argument('--cookies', type=int, default=300, help="cookies in the synthetic cookie file")
+    args = parser.parse_args()
+
+    if not YTDLP_AVAILABLE:
+        sys.exit("yt-dlp is not installed; nothing to measure.")
+    import yt_dlp
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cookie_file = os.path.join(tmp, 'cookies.txt')
+        write_cookie_file(cookie_file, args.cookies)
+
+        for label, cookies in (("no cookie file", None), (f"{args.cookies} cookies", cookie_file)):
+            t0 = time.perf_counter()
+            for _ in range(args.videos):
+                with yt_dlp.YoutubeDL(build_ydl_options('en', cookies)) as ydl:
+                    ydl.get_info_extractor('Youtube')
+            fresh = (time.perf_counter() - t0) / args.videos
+
+            session = YoutubeDLSession()
+            t0 = time.perf_counter()
+            for _ in range(args.videos):
+                session.get('en', cookies).get_info_extractor('Youtube')
+            warm = (time.perf_counter() - t0) / args.videos
+            session.close()
+
+            print(f"{label:<16} fresh instance {fresh * 1e3:8.2f} ms/video   "
+                  f"warm session {warm * 1e3:8.3f} ms/video   saved {(fresh - warm) * 1e3:8.2f} ms/video")
+
+
+if __name__ == '__main__':
+    main()
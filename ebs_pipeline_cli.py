@@ -0,0 +1,211 @@
+"""Headless command line for the EBS subtitle pipeline.
+
+Runs the same engine as the GUI without importing Tk, and reports progress
+as JSON lines on stdout (one object per event), e.g.:
+
+    python ebs_pipeline_cli.py -f urls.txt --lang en -o ./Downloaded-Sub --workers 4
+
+Events: {"event": "log", ...}, {"event": "progress", ...}, {"event": "video", ...},
+{"event": "stats", ...} (throughput, ETA, stage timings) and a final
+{"event": "summary", ...}. SIGINT/SIGTERM cancel gracefully: running extractions are
+abandoned within about a second and finished videos are kept.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ebs_pipeline_core import (
+    MAX_WORKERS,
+    NEGATIVE_CACHE_TTLS,
+    PipelineConfig,
+    PipelineEngine,
+    UrlList,
+    is_supported_url,
+    read_urls_from_file,
+)
+
+
+class JsonLinesEmitter:
+    """Writes one JSON object per line; safe to call from worker threads"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields: Any):
+        record: Dict[str, Any] = {'event': event, 'ts': round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def log(self, message: str, color: Optional[str] = None):
+        self.emit('log', level=color or 'info', message=message.strip('\n'))
+
+    def progress(self, current: int, total: int, description: str):
+        self.emit('progress', current=current, total=total, description=description)
+
+    def video(self, event: Dict[str, Any]):
+        self.emit('video', **event)
+
+    def stats(self, snapshot: Dict[str, Any]):
+        self.emit('stats', **snapshot)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Extract YouTube subtitles without the GUI.")
+    parser.add_argument('urls', nargs='*', help="YouTube video, playlist or channel URLs")
+    parser.add_argument('-f', '--urls-file', action='append', default=[],
+                        help=".txt file with one video/playlist/channel URL per line (repeatable)")
+    parser.add_argument('-o', '--output-dir', default=os.path.join(os.getcwd(), "Downloaded-Sub"),
+                        help="output root folder (default: ./Downloaded-Sub)")
+    parser.add_argument('--lang', default='en', help="subtitle language code(s), comma-separated, e.g. en,vi,ko (default: en)")
+    parser.add_argument('--cookies', help="Netscape cookie file for age-restricted/private videos")
+    parser.add_argument('--start', type=int, default=1, help="start number (default: 1)")
+    parser.add_argument('--pad', type=int, default=0, help="padding width, 0 = auto (default: 0)")
+    parser.add_argument('--folder-prefix', default="Ebs-")
+    parser.add_argument('--subtitle-prefix', default="bcl-")
+    parser.add_argument('--content-prefix', default="Content-")
+    parser.add_argument('--use-title', action='store_true', help="name subtitle files after the video title")
+    parser.add_argument('--no-rate-limit', action='store_true', help="disable the rate limiter")
+    parser.add_argument('--min-wait', type=int, default=20, help="min seconds between requests (default: 20)")
+    parser.add_argument('--max-wait', type=int, default=25, help="max seconds between requests (default: 25)")
+    parser.add_argument('--burst', type=int, default=1, help="requests allowed back-to-back (default: 1)")
+    parser.add_argument('--video-timeout', type=float, default=180,
+                        help="seconds allowed per video for extraction and subtitle downloads, 0 = no limit (default: 180)")
+    parser.add_argument('--workers', type=int, default=1, help=f"parallel workers, 1-{MAX_WORKERS} (default: 1)")
+    parser.add_argument('--full-extraction', action='store_true',
+                        help="let yt-dlp resolve every format and player client instead of the lighter "
+                             "captions-only extraction")
+    parser.add_argument('--processes', action='store_true',
+                        help="run yt-dlp in --workers worker processes instead of threads (uses several CPU cores)")
+    parser.add_argument('--results', default='youtube_results.jsonl', help="results journal path")
+    parser.add_argument('--subtitle-cache', default='subtitle_cache',
+                        help="raw subtitle cache folder (default: ./subtitle_cache)")
+    parser.add_argument('--subtitle-cache-mb', type=int, default=512,
+                        help="raw subtitle cache size limit in MB (default: 512)")
+    parser.add_argument('--no-subtitle-cache', action='store_true', help="disable the raw subtitle cache")
+    parser.add_argument('--negative-ttl', action='append', default=[], metavar='CLASS=HOURS',
+                        help="how long to skip videos with a known failure before retrying; classes: "
+                             + ", ".join(f"{name} (default {ttl / 3600:g}h)" for name, ttl in NEGATIVE_CACHE_TTLS.items())
+                             + " (repeatable)")
+    parser.add_argument('--no-negative-cache', action='store_true',
+                        help="retry every failed or caption-less video on every run")
+    parser.add_argument('--run-summary-dir', default='run_summaries',
+                        help="folder for per-run timing summaries (default: ./run_summaries)")
+    parser.add_argument('--no-run-summary', action='store_true', help="don't write a run summary JSON")
+    parser.add_argument('--no-resume', action='store_true',
+                        help="start the batch over instead of resuming from its checkpoint manifest")
+    return parser
+
+
+def parse_negative_ttls(values: List[str], disabled: bool) -> Dict[str, float]:
+    """Default TTLs overridden by CLASS=HOURS values; raises ValueError on bad input"""
+    ttls = dict.fromkeys(NEGATIVE_CACHE_TTLS, 0.0) if disabled else dict(NEGATIVE_CACHE_TTLS)
+    for value in values:
+        name, sep, hours = value.partition('=')
+        if not sep or name not in NEGATIVE_CACHE_TTLS:
+            raise ValueError(f"expected CLASS=HOURS with CLASS one of {', '.join(NEGATIVE_CACHE_TTLS)}: {value}")
+        if float(hours) < 0:
+            raise ValueError(f"hours must be non-negative: {value}")
+        ttls[name] = float(hours) * 3600
+    return ttls
+
+
+def collect_urls(args: argparse.Namespace, out: JsonLinesEmitter) -> Optional[List[str]]:
+    urls = UrlList()  # deduplicated by video ID, so URL variants of one video run once
+    for url in args.urls:
+        if is_supported_url(url):
+            urls.add(url)
+        else:
+            out.log(f"Invalid URL - {url}", "yellow")
+    for path in args.urls_file:
+        file_urls = read_urls_from_file(path, out.log)
+        if file_urls is None:
+            return None
+        urls.extend(file_urls)
+    return list(urls)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.min_wait < 0 or args.max_wait < 0 or args.min_wait > args.max_wait:
+        parser.error("--min-wait/--max-wait must be non-negative and min <= max")
+    if args.burst < 1:
+        parser.error("--burst must be at least 1")
+    if not 1 <= args.workers <= MAX_WORKERS:
+        parser.error(f"--workers must be between 1 and {MAX_WORKERS}")
+    if args.cookies and not os.path.exists(args.cookies):
+        parser.error(f"cookie file not found: {args.cookies}")
+    if args.video_timeout < 0:
+        parser.error("--video-timeout must be non-negative")
+    if args.subtitle_cache_mb < 1:
+        parser.error("--subtitle-cache-mb must be at least 1")
+    try:
+        negative_ttls = parse_negative_ttls(args.negative_ttl, args.no_negative_cache)
+    except ValueError as e:
+        parser.error(f"--negative-ttl: {e}")
+
+    out = JsonLinesEmitter()
+    urls = collect_urls(args, out)
+    if urls is None:
+        return 1
+    if not urls:
+        out.emit('summary', total=0, processed=0, saved=0, added=0, cancelled=False, dest_dir=args.output_dir)
+        return 0
+
+    config = PipelineConfig(
+        urls=urls,
+        dest_dir=args.output_dir,
+        start_num=args.start,
+        pad_width=args.pad,
+        folder_prefix=args.folder_prefix,
+        subtitle_file_prefix="" if args.use_title else args.subtitle_prefix,
+        content_file_prefix=args.content_prefix,
+        use_title=args.use_title,
+        selected_lang=args.lang,
+        cookie_file_path=args.cookies,
+        rate_limit_enabled=not args.no_rate_limit,
+        min_wait_time=args.min_wait,
+        max_wait_time=args.max_wait,
+        burst=args.burst,
+        num_workers=args.workers,
+        video_timeout=args.video_timeout or None,
+        use_processes=args.processes,
+        extraction_profile='video' if args.full_extraction else 'captions',
+        negative_ttls=negative_ttls,
+        results_path=args.results,
+        subtitle_cache_dir=None if args.no_subtitle_cache else args.subtitle_cache,
+        subtitle_cache_max_bytes=args.subtitle_cache_mb * 1024 * 1024,
+        run_summary_dir=None if args.no_run_summary else args.run_summary_dir,
+        resume=not args.no_resume,
+    )
+    engine = PipelineEngine(config, out.log, out.progress, out.video, stats_func=out.stats)
+
+    def request_stop(signum, frame):
+        out.log(f"Received signal {signum}; abandoning running videos and stopping.", "yellow")
+        engine.cancel()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    try:
+        summary = engine.run()
+    except Exception as e:
+        out.emit('error', message=f"Critical error occurred: {e}")
+        return 1
+    out.emit('summary', **summary)
+    return 130 if summary['cancelled'] else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,2735 @@
+"""GUI-independent core of the EBS subtitle pipeline.
+
+Shared by the CustomTkinter front end (ebs_pipeline_gui.py) and the headless
+command line (ebs_pipeline_cli.py). Nothing in this module imports Tk.
+"""
+import contextlib
+import hashlib
+import html
+import http.client
+import io
+import itertools
+import importlib.util
+import logging
+import os
+import platform
+import queue
+import random
+import re
+import signal
+import ssl
+import threading
+import time
+import json
+import urllib.parse
+import urllib.request
+import zlib
+from xml.etree import ElementTree
+import multiprocessing.util  # also binds multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Callable, Iterable, Iterator, NamedTuple, Tuple
+
+
+os.environ.pop("SSLKEYLOGFILE", None)
+
+try:
+    import certifi
+
+    os.environ.setdefault("SSL_CERT_FILE", certifi.where())
+except Exception:
+    pass
+
+# Check for yt-dlp availability without importing it: the import pulls in hundreds of
+# extractor modules, so it is deferred to the first extraction (or a background pre-warm)
+YTDLP_AVAILABLE = importlib.util.find_spec('yt_dlp') is not None
+_yt_dlp_module = None
+_yt_dlp_lock = threading.Lock()
+
+
+def load_yt_dlp():
+    """Import yt_dlp on first use. Thread-safe; later calls return the cached module."""
+    global _yt_dlp_module
+    if _yt_dlp_module is None:
+        with _yt_dlp_lock:
+            if _yt_dlp_module is None:
+                import yt_dlp
+                _yt_dlp_module = yt_dlp
+    return _yt_dlp_module
+
+
+def prewarm_yt_dlp() -> Optional[threading.Thread]:
+    """Import yt_dlp on a background thread so the first extraction does not pay for it"""
+    if not YTDLP_AVAILABLE or _yt_dlp_module is not None:
+        return None
+
+    def warm():
+        try:
+            load_yt_dlp()
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=warm, name="ebs-ytdlp-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def yt_dlp_version() -> Optional[str]:
+    """Installed yt-dlp version, without importing it if it isn't loaded yet"""
+    if _yt_dlp_module is not None:
+        return getattr(getattr(_yt_dlp_module, 'version', None), '__version__', None)
+    try:
+        from importlib.metadata import version
+        return version('yt-dlp')
+    except Exception:
+        return None
+
+
+# Upper bound for the extraction worker pool
+MAX_WORKERS = 16
+
+
+# ====== Helper Functions ======
+# watch (v= anywhere in the query), youtu.be, embed, /v/, shorts and live URLs on
+# www., m., music. and youtube-nocookie.com hosts
+_VIDEO_ID_RE = re.compile(
+    r'(?:youtube(?:-nocookie)?\.com/(?:watch/?\?(?:[^#]*?&)?v=|embed/|v/|e/|shorts/|live/)|youtu\.be/)'
+    r'([a-zA-Z0-9_-]{11})(?![a-zA-Z0-9_-])')
+
+
+def extract_video_id(url):
+    """Extract video ID from YouTube URL"""
+    m = _VIDEO_ID_RE.search(url)
+    return m.group(1) if m else None
+
+
+def canonical_video_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+_COLLECTION_URL_RE = re.compile(
+    r'youtube\.com/(?:playlist\?(?:[^#]*&)?list=[\w-]+'
+    r'|(?:channel/UC[\w-]{22}|@[\w.-]+|c/[^/?#]+|user/[^/?#]+)(?:/(?:videos|streams|shorts|featured))?/?(?:[?#]|$))')
+
+
+def is_collection_url(url: str) -> bool:
+    """True for playlist, channel and uploads URLs (but not a video inside a playlist)"""
+    return extract_video_id(url) is None and _COLLECTION_URL_RE.search(url) is not None
+
+
+def is_supported_url(url: str) -> bool:
+    """A single video, or a playlist/channel that is expanded when the run starts"""
+    return extract_video_id(url) is not None or is_collection_url(url)
+
+
+def url_key(url: str) -> str:
+    """Dedup key: the video ID, so youtu.be/X, watch?v=X&t=10 and m.youtube.com variants collide"""
+    vid = extract_video_id(url)
+    if vid:
+        return vid
+    return re.sub(r'^(?:https?://)?(?:www\.|m\.)?', '', url.strip()).rstrip('/')
+
+
+class UrlList:
+    """Insertion-ordered URL queue with O(1) duplicate checks by canonical video ID"""
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self.urls: List[str] = []
+        self._keys = set()
+        self.collection_count = 0  # playlists/channels, whose video count is unknown until listed
+        self.extend(urls)
+
+    def add(self, url: str) -> bool:
+        """Append url unless the same video is already queued; returns True if added"""
+        key = url_key(url)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self.urls.append(url)
+        if is_collection_url(url):
+            self.collection_count += 1
+        return True
+
+    def extend(self, urls: Iterable[str]) -> int:
+        return sum(self.add(url) for url in urls)
+
+    def clear(self):
+        self.urls.clear()
+        self._keys.clear()
+        self.collection_count = 0
+
+    def __contains__(self, url: str) -> bool:
+        return url_key(url) in self._keys
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.urls)
+
+
+class SubtitleFetchError(Exception):
+    """Raised when a subtitle track request returns an HTTP error status"""
+
+    def __init__(self, url: str, status: int, reason: str = ''):
+        super().__init__(f"HTTP {status} {reason} for {url}".replace('  ', ' '))
+        self.url = url
+        self.status = status
+
+
+class TooManyRedirects(SubtitleFetchError):
+    """Raised when a subtitle track request keeps redirecting past the client's limit"""
+
+    def __init__(self, url: str, max_redirects: int):
+        Exception.__init__(self, f"More than {max_redirects} redirects for {url}")
+        self.url = url
+        self.status = 0  # no HTTP error status; the last response was itself a redirect
+
+
+class SubtitleHTTPClient:
+    """Keep-alive HTTP(S) client for subtitle track downloads.
+
+    Connections are pooled per host and per thread, so a single client can be
+    shared by every extraction worker without sockets being shared between
+    threads. Requests advertise gzip and bodies are decompressed while they
+    are streamed off the socket.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, connect_timeout: float = 10.0, read_timeout: float = 30.0, max_redirects: int = 5,
+                 user_agent: str = 'Mozilla/5.0 (EBS-Tool-Pack)'):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_redirects = max_redirects
+        self.user_agent = user_agent
+        self._local = threading.local()
+        self._all_connections: List[Tuple[threading.Thread, http.client.HTTPConnection]] = []  # (owner, conn)
+        self._lock = threading.Lock()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def _pool(self) -> Dict[tuple, http.client.HTTPConnection]:
+        pool = getattr(self._local, 'pool', None)
+        if pool is None:
+            pool = self._local.pool = {}
+        return pool
+
+    def _new_connection(self, scheme: str, host: str, port: Optional[int]) -> http.client.HTTPConnection:
+        proxy = urllib.request.getproxies().get(scheme)
+        if proxy and urllib.request.proxy_bypass(host):
+            proxy = None
+        target_host, target_port = host, port
+        if proxy:
+            parsed_proxy = urllib.parse.urlsplit(proxy)
+            target_host, target_port = parsed_proxy.hostname, parsed_proxy.port
+        if scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            conn = http.client.HTTPSConnection(target_host, target_port, timeout=self.connect_timeout,
+                                               context=self._ssl_context)
+            if proxy:
+                conn.set_tunnel(host, port)
+        else:
+            conn = http.client.HTTPConnection(target_host, target_port, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        with self._lock:
+            self._all_connections.append((threading.current_thread(), conn))
+        return conn
+
+    def _request(self, url: str):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        key = (scheme, parts.hostname, parts.port)
+        path = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+        headers = {
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive',
+            'User-Agent': self.user_agent,
+        }
+        pool = self._pool()
+        for attempt in range(2):
+            conn = pool.get(key)
+            reused = conn is not None
+            if conn is None:
+                conn = pool[key] = self._new_connection(scheme, parts.hostname, parts.port)
+            # Plain-HTTP proxies take the absolute URL as the request target
+            target = url if scheme == 'http' and conn.host != parts.hostname else path
+            try:
+                conn.request('GET', target, headers=headers)
+                return key, conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError,
+                    http.client.CannotSendRequest, http.client.BadStatusLine):
+                # The server closed an idle keep-alive connection; retry once on a fresh one
+                self._discard(key, conn)
+                if not reused or attempt:
+                    raise
+            except Exception:
+                self._discard(key, conn)
+                raise
+
+    def _discard(self, key: tuple, conn: http.client.HTTPConnection):
+        pool = self._pool()
+        if pool.get(key) is conn:
+            del pool[key]
+        conn.close()
+        with self._lock:
+            self._all_connections = [item for item in self._all_connections if item[1] is not conn]
+
+    def _read_body(self, resp: http.client.HTTPResponse) -> bytes:
+        gzipped = (resp.getheader('Content-Encoding') or '').lower() == 'gzip'
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+        chunks = []
+        while True:
+            chunk = resp.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(decoder.decompress(chunk) if decoder else chunk)
+        if decoder:
+            chunks.append(decoder.flush())
+        return b''.join(chunks)
+
+    def fetch(self, url: str) -> bytes:
+        """GET a URL over a pooled connection and return the decoded body"""
+        for _ in range(self.max_redirects + 1):
+            key, conn, resp = self._request(url)
+            try:
+                body = self._read_body(resp)
+            except Exception:
+                self._discard(key, conn)
+                raise
+            if resp.will_close:
+                self._discard(key, conn)
+            if resp.status in (301, 302, 303, 307, 308) and resp.getheader('Location'):
+                url = urllib.parse.urljoin(url, resp.getheader('Location'))
+                continue
+            if resp.status >= 400:
+                raise SubtitleFetchError(url, resp.status, resp.reason)
+            return body
+        raise TooManyRedirects(url, self.max_redirects)
+
+    def fetch_text(self, url: str) -> str:
+        return self.fetch(url).decode('utf-8')
+
+    async def fetch_many_async(self, urls: List[str], concurrency: int = 8) -> List[Any]:
+        """Fetch many tracks at once; each slot holds the body bytes or the raised exception"""
+        import asyncio  # only needed here; keeps it off the startup path
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(url: str):
+            async with semaphore:
+                return await loop.run_in_executor(None, self.fetch, url)
+
+        return await asyncio.gather(*(fetch_one(u) for u in urls), return_exceptions=True)
+
+    def prune_dead_threads(self) -> int:
+        """Close connections whose owning thread has exited; returns how many were closed.
+
+        A finished worker's pool can never be used again, but its sockets stay
+        open until this or close() runs.
+        """
+        with self._lock:
+            dead = [conn for owner, conn in self._all_connections if not owner.is_alive()]
+            self._all_connections = [item for item in self._all_connections if item[0].is_alive()]
+        for conn in dead:
+            conn.close()
+        return len(dead)
+
+    def close(self):
+        """Close every pooled connection, including those owned by other threads"""
+        with self._lock:
+            connections, self._all_connections = self._all_connections, []
+        for _, conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_default_http_client: Optional[SubtitleHTTPClient] = None
+_default_http_client_lock = threading.Lock()
+
+
+def default_http_client() -> SubtitleHTTPClient:
+    """Process-wide subtitle HTTP client shared by all workers"""
+    global _default_http_client
+    with _default_http_client_lock:
+        if _default_http_client is None:
+            _default_http_client = SubtitleHTTPClient()
+        return _default_http_client
+
+
+def parse_subtitle_payload(raw: str) -> str:
+    """Convert a downloaded subtitle payload (json3 or JSON list) to plain lines"""
+    s = raw.strip()
+    if s.startswith('{') or s.startswith('['):
+        try:
+            data = json.loads(raw)
+            if isinstance(data, dict) and "events" in data:
+                lines = []
+                for ev in data["events"]:
+                    if "segs" in ev:
+                        line = ''.join(seg.get("utf8", "") for seg in ev["segs"]).strip()
+                        if line:
+                            lines.append(line)
+                return "\n".join(lines)
+            if isinstance(data, list):
+                lines = [it.get("text", "") for it in data if it.get("text", "")]
+                return "\n".join(lines)
+            return raw
+        except Exception:
+            return raw
+    return raw
+
+
+def download_subtitle_content(url, client: Optional[SubtitleHTTPClient] = None):
+    """Download subtitle content from URL"""
+    try:
+        raw = (client or default_http_client()).fetch_text(url)
+        return parse_subtitle_payload(raw)
+    except Exception:
+        return ""
+
+
+# Lines dropped outright: cue numbers, timestamps and VTT headers/comments
+_SKIP_LINE_RE = re.compile(r'(?:\d+$|\d{2}:\d{2}:\d{2}|WEBVTT|NOTE)')
+_TAG_RE = re.compile(r'<[^>]+>')
+_ENTITY_RE = re.compile(r'&[a-zA-Z]+;')
+
+
+def iter_clean_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Single-pass subtitle cleaner over any iterable of lines (e.g. an open file).
+
+    Yields the lines clean_subtitles would keep: cue numbers, timestamps,
+    WEBVTT/NOTE headers and '--' separators are dropped, tags and named
+    entities are removed, and consecutive duplicates are collapsed.
+    """
+    skip_match = _SKIP_LINE_RE.match
+    tag_sub = _TAG_RE.sub
+    entity_sub = _ENTITY_RE.sub
+    prev = None
+    for line in lines:
+        line = line.strip()
+        if not line or line == '--' or skip_match(line):
+            continue
+        # Tags go before entities, so '&am<b>p;' is left as '&amp;' exactly as before
+        if '<' in line:
+            line = tag_sub('', line)
+        if '&' in line:
+            line = entity_sub('', line)
+        if line and line != prev:
+            prev = line
+            yield line
+
+
+def clean_subtitles(subtitle_content):
+    """Clean subtitle content"""
+    if not subtitle_content:
+        return "No subtitle content available"
+    return "\n".join(iter_clean_lines(subtitle_content.splitlines())) or "Unable to extract subtitle content"
+
+
+# ====== Subtitle Formats ======
+class Cue(NamedTuple):
+    """One caption cue; times are in seconds"""
+    start: float
+    end: float
+    text: str
+
+
+# json3 first, as before: it is what the tool has always been tuned on. The rest are ordered by
+# gzipped size on the synthetic track in benchmarks/bench_subtitle_formats.py; VTT goes last
+# because auto-caption VTT repeats each line as it rolls.
+SUBTITLE_FORMAT_PREFERENCE = ('json3', 'srv1', 'srv2', 'ttml', 'srv3', 'vtt')
+
+_VTT_TIMING_RE = re.compile(r'((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s+-->\s+((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})')
+_TTML_CLOCK_RE = re.compile(r'(\d+):(\d{2}):(\d{2}(?:\.\d+)?)$')
+_TTML_OFFSET_RE = re.compile(r'(\d+(?:\.\d+)?)(h|m|s|ms|t)$')
+
+
+def select_subtitle_format(tracks: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Pick the cheapest track yt-dlp lists for one language (see SUBTITLE_FORMAT_PREFERENCE)"""
+    candidates = [t for t in tracks or [] if t.get('url')]
+    if not candidates:
+        return None
+
+    def rank(item):
+        pos, track = item
+        ext = (track.get('ext') or '').lower()
+        pref = SUBTITLE_FORMAT_PREFERENCE.index(ext) if ext in SUBTITLE_FORMAT_PREFERENCE else len(
+            SUBTITLE_FORMAT_PREFERENCE)
+        return pref, pos
+
+    return min(enumerate(candidates), key=rank)[1]
+
+
+def _clock_to_seconds(value: str) -> float:
+    parts = value.replace(',', '.').split(':')
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+_JSON3_EVENTS_RE = re.compile(r'"events"\s*:\s*\[')
+_JSON_SEPARATOR_RE = re.compile(r'[\s,]*')
+_JSON_DECODER = json.JSONDecoder()
+
+
+def iter_json3_cues(text: str) -> Iterator[Cue]:
+    """Incremental json3 parser: events are decoded one at a time, never the whole document"""
+    m = _JSON3_EVENTS_RE.search(text)
+    if not m:
+        return
+    pos = m.end()
+    while True:
+        pos = _JSON_SEPARATOR_RE.match(text, pos).end()
+        if pos >= len(text):
+            raise ValueError("Unterminated json3 events array")
+        if text[pos] == ']':
+            return
+        ev, pos = _JSON_DECODER.raw_decode(text, pos)
+        if not isinstance(ev, dict) or 'segs' not in ev:
+            continue
+        cue_text = ''.join(seg.get('utf8', '') for seg in ev['segs']).strip()
+        if cue_text:
+            start = ev.get('tStartMs', 0) / 1000.0
+            yield Cue(start, start + ev.get('dDurationMs', 0) / 1000.0, cue_text)
+
+
+def parse_json3(payload: bytes) -> List[Cue]:
+    return list(iter_json3_cues(payload.decode('utf-8-sig')))
+
+
+def iter_vtt_cues(lines: Iterable[str]) -> Iterator[Cue]:
+    """Streaming WebVTT parser; inline timestamp/style tags and entities are removed"""
+    timing = None
+    text_lines: List[str] = []
+    for raw_line in itertools.chain(lines, ['']):
+        line = raw_line.strip()
+        if not line:
+            if timing and text_lines:
+                text = '\n'.join(text_lines).strip()
+                if text:
+                    yield Cue(timing[0], timing[1], text)
+            timing, text_lines = None, []
+            continue
+        m = _VTT_TIMING_RE.match(line)
+        if m:
+            timing = (_clock_to_seconds(m.group(1)), _clock_to_seconds(m.group(2)))
+            text_lines = []
+        elif timing:
+            text = html.unescape(_TAG_RE.sub('', line)).strip()
+            if text:
+                text_lines.append(text)
+
+
+def _ttml_time(value: Optional[str], tick_rate: float) -> float:
+    if not value:
+        return 0.0
+    value = value.strip()
+    m = _TTML_CLOCK_RE.match(value)
+    if m:
+        return int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+    m = _TTML_OFFSET_RE.match(value)
+    if m:
+        number, unit = float(m.group(1)), m.group(2)
+        return {'h': number * 3600, 'm': number * 60, 's': number, 'ms': number / 1000.0,
+                't': number / tick_rate}[unit]
+    return _clock_to_seconds(value)
+
+
+def _xml_text(elem: ElementTree.Element) -> str:
+    parts = []
+    for node in elem.iter():
+        if node.tag.rsplit('}', 1)[-1] == 'br':
+            parts.append('\n')
+        if node.text:
+            parts.append(node.text)
+        if node.tail and node is not elem:
+            parts.append(node.tail)
+    return html.unescape(''.join(parts)).strip()
+
+
+def iter_xml_cues(stream) -> Iterator[Cue]:
+    """Streaming parser for YouTube srv1/srv2/srv3 and TTML, via ElementTree.iterparse"""
+    tick_rate = 10000000.0
+    for event, elem in ElementTree.iterparse(stream, events=('start', 'end')):
+        tag = elem.tag.rsplit('}', 1)[-1]
+        if event == 'start':
+            if tag == 'tt':
+                rate = next((v for k, v in elem.attrib.items() if k.rsplit('}', 1)[-1] == 'tickRate'), None)
+                if rate:
+                    tick_rate = float(rate)
+            continue
+        if tag == 'text' and 'start' in elem.attrib:
+            # srv1: <text start="s" dur="s">
+            start = float(elem.get('start'))
+            end = start + float(elem.get('dur', 0))
+        elif tag in ('text', 'p') and 't' in elem.attrib:
+            # srv2 <text t d> / srv3 <p t d><s>..</s></p>, milliseconds
+            start = int(elem.get('t')) / 1000.0
+            end = start + int(elem.get('d', 0)) / 1000.0
+        elif tag == 'p' and 'begin' in elem.attrib:
+            start = _ttml_time(elem.get('begin'), tick_rate)
+            end = _ttml_time(elem.get('end'), tick_rate) if elem.get('end') else start + _ttml_time(
+                elem.get('dur'), tick_rate)
+        else:
+            continue
+        text = _xml_text(elem)
+        elem.clear()
+        if text:
+            yield Cue(start, end, text)
+
+
+def parse_subtitle(payload: bytes, ext: Optional[str]) -> List[Cue]:
+    """Parse a downloaded track into cues according to its yt-dlp 'ext'"""
+    ext = (ext or '').lower()
+    if ext == 'json3':
+        return parse_json3(payload)
+    if ext in ('srv1', 'srv2', 'srv3', 'ttml', 'xml'):
+        return list(iter_xml_cues(io.BytesIO(payload)))
+    if ext == 'vtt':
+        return list(iter_vtt_cues(io.StringIO(payload.decode('utf-8'))))
+    raise ValueError(f"Unsupported subtitle format: {ext or 'unknown'}")
+
+
+def cues_to_text(cues: Iterable[Cue]) -> str:
+    """Plain-text form of a cue list (one line per caption line), before cleaning"""
+    return '\n'.join(cue.text for cue in cues)
+
+
+def subtitle_payload_to_text(payload: bytes, ext: Optional[str]) -> str:
+    """Structured parse where the format is known, falling back to content sniffing"""
+    try:
+        cues = parse_subtitle(payload, ext)
+    except (ValueError, ElementTree.ParseError, UnicodeDecodeError):
+        return parse_subtitle_payload(payload.decode('utf-8', errors='replace'))
+    return cues_to_text(cues)
+
+
+# Bump when subtitle text changes for a reason the code fingerprint below can't see
+# (e.g. a new regex flag in a module constant)
+SUBTITLE_CLEANER_VERSION = 1
+
+# Everything between a raw track payload and the stored subtitle text
+_CLEANER_FUNCTIONS = ('subtitle_payload_to_text', 'parse_subtitle', 'parse_json3', 'iter_json3_cues',
+                      'iter_vtt_cues', 'iter_xml_cues', 'cues_to_text', 'parse_subtitle_payload',
+                      'clean_subtitles', 'iter_clean_lines')
+_cleaner_fingerprints: Dict[tuple, str] = {}
+
+
+def cleaner_version() -> str:
+    """Fingerprint of the payload-to-text pipeline, stored as 'cleaner' on every result.
+
+    Hashes the code of the functions currently bound to the names above, so
+    changing or replacing clean_subtitles (or a parser) marks every stored text
+    as stale; the engine then re-cleans it from the raw subtitle cache.
+    """
+    funcs = tuple(globals()[name] for name in _CLEANER_FUNCTIONS)
+    key = tuple(id(func.__code__) for func in funcs)
+    version = _cleaner_fingerprints.get(key)
+    if version is None:
+        h = hashlib.sha256(str(SUBTITLE_CLEANER_VERSION).encode())
+        for func in funcs:
+            _hash_code(h, func.__code__)
+        version = _cleaner_fingerprints[key] = h.hexdigest()[:12]
+    return version
+
+
+def _hash_code(h, code):
+    """Feed a code object to `h` using only data that is the same in every interpreter run"""
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode('utf-8'))
+    for const in code.co_consts:
+        _hash_const(h, const)
+
+
+def _hash_const(h, const):
+    # Nested code objects (genexprs, lambdas) repr with their address, and frozenset
+    # order follows string hash randomization, so both are walked instead of repr'd
+    if hasattr(const, 'co_code'):
+        _hash_code(h, const)
+    elif isinstance(const, (tuple, frozenset)):
+        h.update(b'(' if isinstance(const, tuple) else b'{')
+        items = const if isinstance(const, tuple) else sorted(const, key=repr)
+        for item in items:
+            _hash_const(h, item)
+        h.update(b')')
+    else:
+        h.update(repr(const).encode('utf-8'))
+
+
+def parse_languages(text: str) -> List[str]:
+    """Split a language field like 'en, vi ko' into unique codes, keeping order"""
+    languages: List[str] = []
+    for code in re.split(r'[\s,;]+', text or ''):
+        if code and code not in languages:
+            languages.append(code)
+    return languages or ['en']
+
+
+def has_subtitles(text: Optional[str]) -> bool:
+    """False for missing text and the 'No ...' / 'Error downloading ...' placeholders"""
+    return bool(text) and not text.startswith("No ") and not text.startswith("Error downloading")
+
+
+def record_subtitles(r: Dict[str, Any]) -> Dict[str, str]:
+    """Per-language subtitle text of a result, including single-language records from older runs"""
+    by_lang = dict(r.get('subtitles_by_lang') or {})
+    if not by_lang and r.get('extracted_lang') and 'subtitles' in r:
+        by_lang[r['extracted_lang']] = r['subtitles']
+    return by_lang
+
+
+def caption_language_variants(lang_code: str) -> List[str]:
+    """Automatic-caption language codes to try for a requested language"""
+    # Include common variants for English, otherwise use exact code
+    if lang_code.lower() == 'en':
+        return ['en', 'en-US', 'en-GB']
+    # Add other common variants if needed, e.g., for Portuguese: ['pt', 'pt-BR', 'pt-PT']
+    return [lang_code]
+
+
+# ====== Subtitle Cache ======
+class SubtitleCache:
+    """Content-addressed on-disk cache of raw subtitle payloads with an LRU byte budget.
+
+    Payloads live once under objects/<hh>/<sha256>, whatever key points at
+    them. Keys (video_id, language, kind, format) are small ref files under
+    refs/<video_id>/ that hold the hash. Reads touch the ref and object mtimes,
+    and once the total size exceeds max_bytes the least recently used objects
+    are deleted. Refs left dangling by eviction count as misses.
+    With evict=False the cache never deletes: extraction processes open it that
+    way and the parent's cache counts their writes (add_external) and evicts.
+    """
+
+    EVICT_TO = 0.9  # evict down to this fraction of the budget so eviction is not run on every put
+
+    def __init__(self, root: str = 'subtitle_cache', max_bytes: int = 512 * 1024 * 1024, evict: bool = True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.evict = evict
+        self._objects = os.path.join(root, 'objects')
+        self._refs = os.path.join(root, 'refs')
+        self._lock = threading.Lock()
+        os.makedirs(self._objects, exist_ok=True)
+        os.makedirs(self._refs, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._scan_objects())
+
+    @staticmethod
+    def _safe(part: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', part)
+
+    def _ref_path(self, video_id: str, lang: str, kind: str, ext: str) -> str:
+        return os.path.join(self._refs, self._safe(video_id), f"{self._safe(kind)}--{self._safe(lang)}.{self._safe(ext)}")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self._objects, digest[:2], digest)
+
+    def _scan_objects(self) -> Iterator[tuple]:
+        for bucket in os.scandir(self._objects):
+            if bucket.is_dir():
+                for entry in os.scandir(bucket.path):
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        st = entry.stat()
+                        yield st.st_mtime, entry.path, st.st_size
+
+    def get(self, video_id: str, lang: str, kind: str, ext: str) -> Optional[bytes]:
+        ref_path = self._ref_path(video_id, lang, kind, ext)
+        try:
+            with open(ref_path, 'r', encoding='ascii') as f:
+                digest = f.read().strip()
+            obj_path = self._object_path(digest)
+            with open(obj_path, 'rb') as f:
+                payload = f.read()
+        except OSError:
+            return None
+        if hashlib.sha256(payload).hexdigest() != digest:
+            # Corrupt or truncated object: drop it so the next run re-downloads
+            with self._lock:
+                self._remove(obj_path)
+            return None
+        for path in (ref_path, obj_path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return payload
+
+    def put(self, video_id: str, lang: str, kind: str, ext: str, payload: bytes) -> str:
+        digest = hashlib.sha256(payload).hexdigest()
+        obj_path = self._object_path(digest)
+        with self._lock:
+            if not os.path.exists(obj_path):
+                os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+                tmp_path = f"{obj_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, obj_path)
+                self.total_bytes += len(payload)
+            else:
+                os.utime(obj_path)
+            ref_path = self._ref_path(video_id, lang, kind, ext)
+            os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+            tmp_path = f"{ref_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='ascii') as f:
+                f.write(digest)
+            os.replace(tmp_path, ref_path)
+            if self.evict and self.total_bytes > self.max_bytes:
+                self._evict()
+        return digest
+
+    def add_external(self, nbytes: int):
+        """Count bytes another process wrote to this directory, evicting if that crosses the budget"""
+        with self._lock:
+            self.total_bytes += nbytes
+            if self.evict and self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def find(self, video_id: str, lang_code: str) -> Optional[Dict[str, Any]]:
+        """Best cached track for a language, in the same order find_subtitle_tracks uses"""
+        try:
+            names = set(os.listdir(os.path.join(self._refs, self._safe(video_id))))
+        except OSError:
+            return None
+        wanted = [('manual', lang_code)] + [('auto', lc) for lc in caption_language_variants(lang_code)]
+        for kind, lang in wanted:
+            for ext in SUBTITLE_FORMAT_PREFERENCE:
+                if f"{self._safe(kind)}--{self._safe(lang)}.{ext}" in names:
+                    payload = self.get(video_id, lang, kind, ext)
+                    if payload is not None:
+                        return {'kind': kind, 'lang': lang, 'ext': ext, 'payload': payload}
+        return None
+
+    def _remove(self, path: str):
+        """Delete an object file; caller holds the lock"""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        self.total_bytes -= size
+
+    def _evict(self):
+        objects = sorted(self._scan_objects())
+        # Re-count from disk: other processes may have written or deleted objects since the last scan
+        self.total_bytes = sum(size for _, _, size in objects)
+        target = self.max_bytes * self.EVICT_TO
+        for _, path, _ in objects:
+            if self.total_bytes <= target:
+                break
+            self._remove(path)
+
+
+def find_subtitle_tracks(info: Dict[str, Any], lang_code: str) -> List[Dict[str, Any]]:
+    """Candidate tracks for a language in priority order: manual, then automatic captions.
+
+    Each candidate is the cheapest format listed, tagged with 'kind' and 'lang'.
+    """
+    subs = info.get('subtitles', {}) or {}
+    auto = info.get('automatic_captions', {}) or {}
+    candidates = []
+
+    # Prioritize manual subtitles for the specified language
+    track = select_subtitle_format(subs.get(lang_code, []))
+    if track:
+        candidates.append(dict(track, kind='manual', lang=lang_code))
+
+    # Then try automatic captions for the specified language
+    for lc in caption_language_variants(lang_code):
+        track = select_subtitle_format(auto.get(lc, []))
+        if track:
+            candidates.append(dict(track, kind='auto', lang=lc))
+    return candidates
+
+
+# Lifetime assumed for a track listing whose URLs carry no 'expire' parameter
+TRACK_LISTING_TTL = 5 * 3600
+# A listing counts as expired this many seconds before its first URL expires
+TRACK_LISTING_MARGIN = 300
+
+
+def _url_expiry(url: str) -> Optional[float]:
+    values = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get('expire')
+    try:
+        return float(values[0]) if values else None
+    except ValueError:
+        return None
+
+
+def build_track_listing(info: Dict[str, Any], languages: List[str]) -> Dict[str, Any]:
+    """Compact caption track listing to keep with a result: kind -> language -> {ext: url}.
+
+    Only the format fetch_subtitles would pick is kept per track. Every manual
+    language and every untranslated automatic caption is listed, plus the
+    automatic variants of `languages`; the ~150 machine-translated tracks
+    YouTube offers per video are left out. 'expires_at' is when the first
+    signed URL expires.
+    """
+    wanted_auto = {lc for lang in languages for lc in caption_language_variants(lang)}
+    listing: Dict[str, Any] = {'subtitles': {}, 'automatic_captions': {}}
+    expiries = []
+    for kind in ('subtitles', 'automatic_captions'):
+        for lang, tracks in (info.get(kind) or {}).items():
+            track = select_subtitle_format(tracks)
+            if track is None:
+                continue
+            if kind == 'automatic_captions' and lang not in wanted_auto and 'tlang=' in track['url']:
+                continue
+            listing[kind][lang] = {track.get('ext') or '': track['url']}
+            expiry = _url_expiry(track['url'])
+            if expiry:
+                expiries.append(expiry)
+    listing['expires_at'] = min(expiries) if expiries else time.time() + TRACK_LISTING_TTL
+    return listing
+
+
+def track_listing_is_fresh(listing: Optional[Dict[str, Any]]) -> bool:
+    """True while the signed URLs of a stored track listing can still be downloaded"""
+    return bool(listing) and time.time() < listing.get('expires_at', 0) - TRACK_LISTING_MARGIN
+
+
+def track_listing_info(video_id: Optional[str], listing: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the part of an info dict fetch_subtitles reads from a stored track listing"""
+    info: Dict[str, Any] = {'id': video_id}
+    for kind in ('subtitles', 'automatic_captions'):
+        info[kind] = {lang: [{'ext': ext, 'url': url} for ext, url in formats.items()]
+                      for lang, formats in (listing.get(kind) or {}).items()}
+    return info
+
+
+def fetch_subtitles(info: Dict[str, Any], lang_code: str, client: Optional[SubtitleHTTPClient] = None,
+                    cache: Optional[SubtitleCache] = None, stats: Optional['RunStats'] = None) -> Dict[str, Any]:
+    """Download (or read from cache) the best track for a language and clean it.
+
+    Returns {'text': ...} plus 'kind', 'lang' and 'ext' of the track used, if any.
+    When every download failed, 'throttled' says whether YouTube rate limited one (HTTP 429).
+    """
+    video_id = info.get('id')
+    download_error: Optional[Exception] = None
+    throttled = False
+    for track in find_subtitle_tracks(info, lang_code):
+        ext = track.get('ext') or ''
+        payload = cache.get(video_id, track['lang'], track['kind'], ext) if cache and video_id else None
+        if payload is None:
+            try:
+                with timed(stats, 'download'):
+                    payload = (client or default_http_client()).fetch(track['url'])
+            except Exception as e:
+                download_error = e
+                throttled = throttled or (isinstance(e, SubtitleFetchError) and e.status == 429) \
+                    or is_throttle_error(str(e))
+                continue
+            if cache and video_id:
+                cache.put(video_id, track['lang'], track['kind'], ext, payload)
+        with timed(stats, 'clean'):
+            text = subtitle_payload_to_text(payload, ext)
+            cleaned = clean_subtitles(text) if text else None
+        if cleaned is not None:
+            return {'text': cleaned, 'kind': track['kind'], 'lang': track['lang'], 'ext': ext}
+    if download_error is not None:
+        # Tracks exist but could not be downloaded: a transient failure, not a video without captions
+        return {'text': f"Error downloading subtitles for {lang_code}: {download_error}", 'throttled': throttled}
+    return {'text': f"No {lang_code} subtitles available"}
+
+
+def get_subtitles(info: Dict[str, Any], lang_code: str, client: Optional[SubtitleHTTPClient] = None,
+                  cache: Optional[SubtitleCache] = None):
+    """Get subtitles for a specific language from video info"""
+    try:
+        return fetch_subtitles(info, lang_code, client, cache)['text']
+    except Exception as e:
+        return f"Error downloading subtitles for {lang_code}: {e}"
+
+
+# Seconds any single yt-dlp connect or read may block before it fails
+SOCKET_TIMEOUT = 20.0
+
+# Player clients asked for captions in the 'captions' profile. yt-dlp's default set
+# (which varies by version) requests several player responses per video; one is
+# enough to list subtitle tracks
+CAPTIONS_PLAYER_CLIENTS = ('tv',)
+
+
+def build_ydl_options(selected_lang: str = 'en', cookie_file_path: Optional[str] = None,
+                      profile: str = 'video') -> Dict[str, Any]:
+    """yt-dlp options used for metadata and subtitle listing.
+
+    profile='video' is a full extraction with every format resolved. 'captions'
+    asks for the minimum needed to list subtitle tracks: one player client and
+    no DASH/HLS manifests (get_video_info also skips format processing).
+    'flat' lists playlist/channel entries (IDs only) without resolving each video.
+    """
+    if profile == 'flat':
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+            'lazy_playlist': True,
+            'retries': 5,
+            'socket_timeout': SOCKET_TIMEOUT,
+        }
+        if cookie_file_path and os.path.exists(cookie_file_path):
+            ydl_opts['cookiefile'] = cookie_file_path
+        return ydl_opts
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extractaudio': False,
+        'extract_flat': False,
+        # Removed sleep_interval and max_sleep_interval here as they are now handled by the GUI logic
+        'retries': 5,
+        'socket_timeout': SOCKET_TIMEOUT,  # no single connect/read may hang longer than this
+        # Ensure yt-dlp extracts subtitle metadata, even if we download content ourselves
+        'writesubtitles': True,
+        'writeautomaticsub': True,
+        'subtitleslangs': parse_languages(selected_lang),  # Hint yt-dlp to look for these languages
+    }
+    if profile == 'captions':
+        ydl_opts.update({
+            'noplaylist': True,
+            'check_formats': False,
+            'extractor_args': {'youtube': {'player_client': list(CAPTIONS_PLAYER_CLIENTS),
+                                           'skip': ['dash', 'hls']}},
+        })
+    if cookie_file_path and os.path.exists(cookie_file_path):
+        ydl_opts['cookiefile'] = cookie_file_path
+    return ydl_opts
+
+
+class YoutubeDLSession:
+    """Long-lived YoutubeDL instances, one per worker thread, keyed by options.
+
+    Constructing a YoutubeDL sets up the extractor registry and parses the
+    cookie file, and each instance keeps its own player JS and signature
+    caches. Reusing one per thread keeps all of that warm across videos; the
+    instance is rebuilt only when the language or cookie file changes. Each
+    options profile ('captions', 'video', 'flat') has its own slot, so listing a playlist
+    does not evict the thread's video extractor.
+    YoutubeDL is not thread-safe, so instances are never shared between threads.
+    """
+
+    def __init__(self, factory: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.factory = factory
+        self._local = threading.local()
+        self._instances: List[Tuple[threading.Thread, Any]] = []  # (owning thread, instance)
+        self._lock = threading.Lock()
+
+    def get(self, selected_lang: str = 'en', cookie_file_path: Optional[str] = None,
+            log_func: Optional[Callable[[str, Optional[str]], None]] = None, profile: str = 'video'):
+        key = (selected_lang, cookie_file_path if cookie_file_path and os.path.exists(cookie_file_path) else None)
+        entries = getattr(self._local, 'entries', None)
+        if entries is None:
+            entries = self._local.entries = {}
+        entry = entries.get(profile)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        if entry is not None:
+            self._release(entry[1])
+        ydl_opts = build_ydl_options(selected_lang, cookie_file_path, profile)
+        if 'cookiefile' in ydl_opts and log_func:
+            log_func(f"Using cookie file: {os.path.basename(cookie_file_path)}", "blue")
+        factory = self.factory or load_yt_dlp().YoutubeDL
+        ydl = factory(ydl_opts)
+        with self._lock:
+            self._instances.append((threading.current_thread(), ydl))
+        entries[profile] = (key, ydl)
+        return ydl
+
+    def _release(self, ydl):
+        with self._lock:
+            self._instances = [item for item in self._instances if item[1] is not ydl]
+        ydl.close()
+
+    def _take(self, thread: Optional[threading.Thread] = None) -> List[Any]:
+        with self._lock:
+            taken = [ydl for owner, ydl in self._instances if thread is None or owner is thread]
+            self._instances = [item for item in self._instances if thread is not None and item[0] is not thread]
+        return taken
+
+    @staticmethod
+    def _close_all(instances: List[Any]):
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception:
+                pass
+
+    def detach_thread(self, thread: threading.Thread) -> Callable[[], None]:
+        """Hand `thread`'s instances over to that thread, e.g. when its call is abandoned.
+
+        close() no longer touches them, so they are not closed while still in use.
+        Returns a function for the thread to run once it is done with them.
+        """
+        detached = self._take(thread)
+
+        def close_detached():
+            self._close_all(detached + self._take(thread))
+
+        return close_detached
+
+    def close(self):
+        """Close every instance (this saves the cookie jar back to the cookie file)"""
+        self._close_all(self._take())
+        self._local = threading.local()
+
+
+_default_ydl_session = YoutubeDLSession()
+
+
+def default_ydl_session() -> YoutubeDLSession:
+    """Process-wide YoutubeDL session used when callers do not pass their own"""
+    return _default_ydl_session
+
+
+def resolve_url_results(ydl, info: Dict[str, Any], max_hops: int = 3) -> Dict[str, Any]:
+    """Follow the 'url' / 'url_transparent' results an unprocessed extract_info can return"""
+    for _ in range(max_hops):
+        if info.get('_type') not in ('url', 'url_transparent') or not info.get('url'):
+            break
+        outer = info
+        info = ydl.extract_info(outer['url'], download=False, process=False)
+        if outer['_type'] == 'url_transparent':
+            # Like yt-dlp: fields set on the transparent wrapper win over the target's
+            info = dict(info, **{k: v for k, v in outer.items()
+                                 if v is not None and k not in ('_type', 'url', 'ie_key')})
+    return info
+
+
+def extract_video_metadata(ydl, url: str, profile: str = 'captions') -> Dict[str, Any]:
+    """extract_info for one video as the given profile needs it.
+
+    The canonical watch URL is requested whenever a video ID is known, so extra
+    parameters such as '&list=' cannot send yt-dlp to the playlist extractor.
+    With the unprocessed 'captions' profile, 'url' / 'url_transparent' results
+    are followed by hand (resolve_url_results), since process=False leaves them unresolved.
+    Raises ValueError if no single video comes back.
+    """
+    vid = extract_video_id(url)
+    info = ydl.extract_info(canonical_video_url(vid) if vid else url, download=False,
+                            process=profile != 'captions')
+    info = resolve_url_results(ydl, info)
+    if info.get('_type', 'video') != 'video' or not info.get('id'):
+        raise ValueError(f"yt-dlp did not return a single video (got {info.get('_type', 'no type')})")
+    return info
+
+
+def get_video_info(url: str, log_func: Callable[[str, Optional[str]], None], selected_lang: str = 'en',
+                   cookie_file_path: Optional[str] = None, session: Optional[YoutubeDLSession] = None,
+                   subtitle_cache: Optional[SubtitleCache] = None, languages: Optional[List[str]] = None,
+                   stats: Optional['RunStats'] = None, profile: str = 'captions'):
+    """Get video information and subtitles for every requested language from one extract_info call.
+
+    `selected_lang` may list several codes ('en,vi,ko'); `languages` narrows the
+    tracks actually downloaded, e.g. to the ones a cached record is missing.
+    With the default 'captions' profile yt-dlp returns the extractor's result
+    unprocessed (process=False): no format sorting or selection, which we never use.
+    See extract_video_metadata for how the URL is resolved.
+    """
+    session = session or default_ydl_session()
+    if not YTDLP_AVAILABLE and session.factory is None:
+        return {'url': url, 'status': 'error', 'error': 'yt-dlp is not available.'}
+    languages = languages or parse_languages(selected_lang)
+    try:
+        ydl = session.get(selected_lang, cookie_file_path, log_func, profile=profile)
+        with timed(stats, 'extract'):
+            info = extract_video_metadata(ydl, url, profile)
+        subtitles_by_lang: Dict[str, str] = {}
+        subtitle_tracks: Dict[str, Dict[str, str]] = {}
+        throttled = False
+        for lang in languages:
+            try:
+                subtitles = fetch_subtitles(info, lang, cache=subtitle_cache, stats=stats)
+            except Exception as e:
+                subtitles = {'text': f"Error downloading subtitles for {lang}: {e}",
+                             'throttled': is_throttle_error(str(e))}
+            subtitles_by_lang[lang] = subtitles['text']
+            throttled = throttled or subtitles.get('throttled', False)
+            if 'kind' in subtitles:
+                subtitle_tracks[lang] = {k: subtitles[k] for k in ('kind', 'lang', 'ext')}
+        result = {
+            'title': info.get('title', 'No title'),
+            'video_id': info.get('id', 'unknown'),
+            'url': url,
+            'subtitles': subtitles_by_lang[languages[0]],
+            'subtitles_by_lang': subtitles_by_lang,
+            'subtitle_tracks': subtitle_tracks,
+            'track_listing': build_track_listing(info, parse_languages(selected_lang)),
+            'cleaner': cleaner_version(),
+            'status': 'success'
+        }
+        if throttled:
+            result['throttled'] = True  # a track download was rate limited; see RateLimiter.note_result
+        return result
+    except Exception as e:
+        log_func(f"Error getting info for {url}: {e}", "red")
+        return {'url': url, 'status': 'error', 'error': f'Error: {e}'}
+
+
+class DeadlineExceeded(Exception):
+    """A call outlived its time budget and was abandoned"""
+
+
+class CallCancelled(Exception):
+    """The run was cancelled while a call was in flight; the call was abandoned"""
+
+
+class _CallHelper(threading.Thread):
+    def __init__(self, name: str):
+        super().__init__(name=name, daemon=True)
+        self.jobs: 'queue.Queue[Optional[list]]' = queue.Queue()
+        self.start()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None or callable(job):
+                if job is not None:
+                    job()  # cleanup handed over when the helper was retired
+                return
+            func, args, kwargs, done, outcome = job
+            try:
+                outcome.append((True, func(*args, **kwargs)))
+            except BaseException as e:
+                outcome.append((False, e))
+            done.set()
+
+
+class BoundedCaller:
+    """Runs calls on helper threads so the calling thread can give up on them.
+
+    yt-dlp and blocking socket reads cannot be interrupted from outside, so a
+    stuck call is abandoned instead of awaited: its helper finishes (or hits
+    its socket timeout) in the background, the result is dropped and the next
+    call from that thread gets a fresh helper. Each calling thread keeps its own
+    helper while calls finish in time, so per-thread YoutubeDL instances stay warm.
+    on_abandon(helper_thread) is called when a helper is given up on; the
+    function it returns runs on that helper after its last call comes back.
+    """
+
+    def __init__(self, name: str = 'ebs-video', poll_interval: float = 0.2,
+                 on_abandon: Optional[Callable[[threading.Thread], Callable[[], None]]] = None):
+        self.name = name
+        self.poll_interval = poll_interval
+        self.on_abandon = on_abandon
+        self._local = threading.local()
+        self._helpers: List[_CallHelper] = []
+        self._lock = threading.Lock()
+        self._count = itertools.count(1)
+
+    def _helper(self) -> _CallHelper:
+        helper = getattr(self._local, 'helper', None)
+        if helper is None:
+            helper = self._local.helper = _CallHelper(f"{self.name}-{next(self._count)}")
+            with self._lock:
+                self._helpers.append(helper)
+        return helper
+
+    def _retire(self, helper: _CallHelper):
+        self._local.helper = None
+        with self._lock:
+            if helper in self._helpers:
+                self._helpers.remove(helper)
+        cleanup = self.on_abandon(helper) if self.on_abandon else None
+        helper.jobs.put(cleanup)  # runs and exits once the abandoned call returns
+
+    def call(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None,
+             stop_event: Optional[threading.Event] = None, **kwargs: Any) -> Any:
+        """func(*args, **kwargs), raising DeadlineExceeded after `timeout` seconds
+        or CallCancelled within `poll_interval` of `stop_event` being set"""
+        helper = self._helper()
+        done = threading.Event()
+        outcome: List[Tuple[bool, Any]] = []
+        helper.jobs.put([func, args, kwargs, done, outcome])
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            wait_for = self.poll_interval
+            if deadline is not None:
+                wait_for = min(wait_for, max(0.0, deadline - time.monotonic()))
+            if done.wait(wait_for):
+                break
+            if stop_event is not None and stop_event.is_set():
+                self._retire(helper)
+                raise CallCancelled()
+            if deadline is not None and time.monotonic() >= deadline:
+                self._retire(helper)
+                raise DeadlineExceeded(f"Timed out after {timeout:.0f} seconds")
+        ok, value = outcome[0]
+        if not ok:
+            raise value
+        return value
+
+    def close(self):
+        with self._lock:
+            helpers, self._helpers = self._helpers, []
+        for helper in helpers:
+            helper.jobs.put(None)
+        for helper in helpers:
+            helper.join()  # idle, so this returns at once; the helpers are then visibly gone
+        self._local = threading.local()
+
+
+# Start method for the extraction process pool. 'spawn' works on every platform and
+# never forks a parent that is already running GUI and worker threads.
+PROCESS_START_METHOD = 'spawn'
+
+# Worker processes per worker thread. An abandoned extraction keeps its process busy until
+# yt-dlp's retries and socket timeouts run out, so spare processes let the next video start.
+PROCESS_POOL_FACTOR = 2
+
+_process_subtitle_cache: Optional[SubtitleCache] = None
+
+
+def _init_extraction_process(subtitle_cache_dir: Optional[str], subtitle_cache_max_bytes: int):
+    """Process-pool initializer: leave Ctrl+C to the parent, open the cache and import yt-dlp once"""
+    global _process_subtitle_cache
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if subtitle_cache_dir:
+        try:
+            # The parent owns the byte budget; this process only reports what it wrote
+            _process_subtitle_cache = SubtitleCache(subtitle_cache_dir, subtitle_cache_max_bytes, evict=False)
+        except OSError:
+            _process_subtitle_cache = None
+    if YTDLP_AVAILABLE:
+        load_yt_dlp()
+    # Pool workers skip atexit; a finalizer still runs when the worker exits and saves the cookie jar
+    multiprocessing.util.Finalize(None, default_ydl_session().close, exitpriority=10)
+
+
+def extract_in_process(url: str, selected_lang: str, cookie_file_path: Optional[str], languages: List[str],
+                       profile: str = 'captions') -> Tuple[Dict[str, Any], List[Tuple[str, Optional[str]]],
+                                                           Dict[str, float], Dict[str, int], int]:
+    """Process-pool entry point for get_video_info.
+
+    Runs in a worker process whose default YoutubeDL session stays warm across
+    calls. Only the trimmed result record crosses back to the parent (never
+    yt-dlp's info dict), together with the log lines, stage timings and the
+    number of bytes added to the subtitle cache.
+    """
+    logs: List[Tuple[str, Optional[str]]] = []
+    stats = RunStats()
+    cache = _process_subtitle_cache
+    cached_bytes = cache.total_bytes if cache is not None else 0
+    r = get_video_info(url, lambda message, color=None: logs.append((message, color)), selected_lang,
+                       cookie_file_path, subtitle_cache=cache, languages=languages, stats=stats,
+                       profile=profile)
+    added = cache.total_bytes - cached_bytes if cache is not None else 0
+    return r, logs, stats.stage_seconds, stats.stage_calls, added
+
+
+def iter_collection_video_ids(url: str, log_func, cookie_file_path: Optional[str] = None,
+                              session: Optional[YoutubeDLSession] = None,
+                              stop_event: Optional[threading.Event] = None) -> Iterator[str]:
+    """Yield the video IDs of a playlist or channel as yt-dlp pages through it.
+
+    Uses flat extraction without processing, so entries are IDs only and the
+    next page is requested only when the caller asks for more; the first
+    videos can be extracted while the rest of a large channel is still listed.
+    """
+    session = session or default_ydl_session()
+    if not YTDLP_AVAILABLE and session.factory is None:
+        log_func(f"yt-dlp is not available; cannot expand {url}", "red")
+        return
+    found = 0
+    try:
+        ydl = session.get('en', cookie_file_path, log_func, profile='flat')
+        # A channel handle or short link can come back as a redirect to the real listing
+        info = resolve_url_results(ydl, ydl.extract_info(url, download=False, process=False))
+        for vid in _iter_flat_entries(ydl, info, log_func, stop_event, depth=0):
+            found += 1
+            yield vid
+    except Exception as e:
+        log_func(f"Error listing videos of {url}: {e}", "red")
+        return
+    if not found and not (stop_event is not None and stop_event.is_set()):
+        log_func(f"⚠ {url} lists no videos; nothing to extract from it.", "yellow")
+
+
+def _iter_flat_entries(ydl, info: Dict[str, Any], log_func, stop_event: Optional[threading.Event],
+                       depth: int) -> Iterator[str]:
+    for entry in info.get('entries') or ():
+        if stop_event is not None and stop_event.is_set():
+            return
+        if not entry:
+            continue
+        entry_url = entry.get('url') or entry.get('webpage_url') or ''
+        vid = entry.get('id') if entry.get('ie_key') == 'Youtube' else extract_video_id(entry_url)
+        if vid:
+            yield vid
+        elif depth < 2 and entry.get('entries') is not None:
+            yield from _iter_flat_entries(ydl, entry, log_func, stop_event, depth + 1)
+        elif depth < 2 and is_collection_url(entry_url):
+            # Channel pages list their tabs (Videos, Shorts, Live) as nested playlists
+            tab = resolve_url_results(ydl, ydl.extract_info(entry_url, download=False, process=False))
+            yield from _iter_flat_entries(ydl, tab, log_func, stop_event, depth + 1)
+
+
+def _index_results(data: List[Any]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """Index a results array by video ID, keeping the first entry for each"""
+    idx, ordered = {}, []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        vid = item.get('video_id') or extract_video_id(item.get('url', '')) or ''
+        if vid and vid not in idx:
+            idx[vid] = item
+            ordered.append(item)
+    return idx, ordered
+
+
+def load_existing_index(results_path='youtube_results.json'):
+    """Load existing results from JSON file"""
+    if not os.path.exists(results_path):
+        return {}, []
+    try:
+        with open(results_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return _index_results(data)
+    except Exception:
+        return {}, []
+
+
+def import_legacy_results(json_path: str, journal_path: str) -> int:
+    """One-time conversion of a youtube_results.json array into a JSONL journal.
+
+    Raises ValueError if the file cannot be read or parsed; the journal is not
+    created then, so the import is tried again once the file is fixed.
+    """
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError("expected a JSON array of results")
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot import {json_path} into the results journal ({e}). "
+                         f"Fix the file or move it away, then run again.") from e
+    _, ordered = _index_results(data)
+    tmp_path = journal_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for item in ordered:
+            f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, journal_path)
+    return len(ordered)
+
+
+class ResultsStore:
+    """Append-only JSONL journal of extraction results, keyed by video ID.
+
+    Every committed result is appended and fsynced immediately, so a crash
+    mid-batch keeps all videos finished so far. Only byte offsets are held in
+    memory and records are read back on demand. Re-committing a video appends
+    a newer line; the journal is compacted once stale lines outnumber live ones.
+    An existing youtube_results.json is imported the first time the store opens.
+    """
+
+    def __init__(self, path: str = 'youtube_results.jsonl', legacy_path: Optional[str] = 'youtube_results.json',
+                 compact_ratio: float = 2.0, compact_min_lines: int = 1000):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.compact_min_lines = compact_min_lines
+        self.imported = 0
+        self.added = 0
+        self._lock = threading.RLock()
+        self._offsets: Dict[str, int] = {}
+        self._status: Dict[str, Optional[str]] = {}
+        self._lines = 0
+        if not os.path.exists(path) and legacy_path and os.path.exists(legacy_path):
+            self.imported = import_legacy_results(legacy_path, path)
+        self._fh = open(path, 'a+b')
+        self._load()
+        self._maybe_compact()
+
+    @staticmethod
+    def key_for(item: Dict[str, Any]) -> Optional[str]:
+        return item.get('video_id') or extract_video_id(item.get('url', '')) or item.get('url')
+
+    def _load(self):
+        self._fh.seek(0)
+        offset = 0
+        for line in self._fh:
+            if not line.endswith(b'\n'):
+                # Torn write from a crash: drop the partial record
+                self._fh.truncate(offset)
+                break
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = None
+            key = self.key_for(item) if isinstance(item, dict) else None
+            if key:
+                self._offsets[key] = offset
+                self._status[key] = item.get('status')
+            self._lines += 1
+            offset += len(line)
+
+    def __contains__(self, vid) -> bool:
+        return vid in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _read_at(self, offset: int) -> bytes:
+        self._fh.seek(offset)
+        return self._fh.readline()
+
+    def get(self, vid: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not vid:
+            return None
+        with self._lock:
+            offset = self._offsets.get(vid)
+            if offset is None:
+                return None
+            return json.loads(self._read_at(offset))
+
+    def commit(self, item: Dict[str, Any]) -> bool:
+        """Durably record a result. Returns True if the video is new to the store."""
+        vid = self.key_for(item)
+        if not vid:
+            return False
+        line = (json.dumps(item, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            is_new = vid not in self._offsets
+            # Never let a failed re-extraction overwrite a good cached result
+            if not is_new and self._status.get(vid) == 'success' and item.get('status') != 'success':
+                return False
+            self._fh.seek(0, os.SEEK_END)
+            offset = self._fh.tell()
+            self._fh.write(line)
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._offsets[vid] = offset
+            self._status[vid] = item.get('status')
+            self._lines += 1
+            if is_new:
+                self.added += 1
+            self._maybe_compact()
+            return is_new
+
+    def _maybe_compact(self):
+        if self._lines >= self.compact_min_lines and self._lines > self.compact_ratio * len(self._offsets):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal with only the latest line per video"""
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            offsets: Dict[str, int] = {}
+            with open(tmp_path, 'wb') as out:
+                for vid, offset in self._offsets.items():
+                    offsets[vid] = out.tell()
+                    out.write(self._read_at(offset))
+                out.flush()
+                os.fsync(out.fileno())
+            self._fh.close()
+            os.replace(tmp_path, self.path)
+            self._fh = open(self.path, 'a+b')
+            self._offsets = offsets
+            self._lines = len(offsets)
+
+    def close(self):
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class CheckpointManifest:
+    """Append-only record of one batch's progress: URL -> assigned number -> stage completed.
+
+    Stages are 'assigned' (number handed out), 'extracted' (result committed to
+    the journal) and 'written' (output files on disk, with their sizes and
+    SHA-256). The manifest lives in the output folder under a key derived from
+    the batch settings, so starting the same batch again reuses the numbers it
+    assigned and skips videos whose outputs are still intact. Lines are flushed
+    but not fsynced: the results journal already makes extractions durable, and
+    a lost tail only means a few videos get written again.
+    """
+
+    STAGES = ('assigned', 'extracted', 'written')
+
+    def __init__(self, path: str, fresh: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._numbers: Dict[int, str] = {}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._fh = open(path, 'w+b' if fresh else 'a+b')
+        self._load()
+
+    @staticmethod
+    def batch_key(config: 'PipelineConfig') -> str:
+        """Fingerprint of everything that decides which files a batch writes where"""
+        spec = {
+            'urls': [url_key(url) for url in config.urls],
+            'dest_dir': os.path.abspath(config.dest_dir),
+            'start_num': config.start_num,
+            'pad_width': config.resolved_pad_width(),
+            'prefixes': [config.folder_prefix, config.subtitle_file_prefix, config.content_file_prefix],
+            'use_title': config.use_title,
+            'languages': config.languages(),
+            # Only the explicit version: the code fingerprint also changes with the Python version,
+            # and a changed cleaner is caught per video (see completed())
+            'cleaner': SUBTITLE_CLEANER_VERSION,
+        }
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def for_config(cls, config: 'PipelineConfig', fresh: bool = False) -> 'CheckpointManifest':
+        path = os.path.join(config.dest_dir, '.checkpoints', f"batch-{cls.batch_key(config)}.jsonl")
+        return cls(path, fresh=fresh)
+
+    def _load(self):
+        self._fh.seek(0)
+        offset = 0
+        for line in self._fh:
+            if not line.endswith(b'\n'):
+                # Torn write from a crash: drop the partial record
+                self._fh.truncate(offset)
+                break
+            offset += len(line)
+            try:
+                item = json.loads(line)
+                key, number, stage = url_key(item['url']), int(item['number']), item['stage']
+            except (ValueError, KeyError, TypeError):
+                continue
+            entry = self._entries.setdefault(key, {})
+            entry.update(item, number=number, stage=stage)
+            self._numbers[number] = key
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def done_count(self) -> int:
+        return sum(1 for e in self._entries.values() if e['stage'] == 'written' and e.get('ok'))
+
+    def number_for(self, url: str, default: int) -> int:
+        """The number this URL was given before, else `default` unless another URL already holds it"""
+        key = url_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry['number']
+            number = default
+            if number in self._numbers:
+                # A playlist or channel listed differently this time; never reuse a number
+                number = max(self._numbers) + 1
+            self._numbers[number] = key
+            self._entries[key] = {'url': url, 'number': number, 'stage': None}
+            return number
+
+    def completed(self, url: str) -> Optional[Dict[str, Any]]:
+        """The 'written' entry for a successful video whose output files are unchanged, else None"""
+        with self._lock:
+            entry = self._entries.get(url_key(url))
+        if not entry or entry['stage'] != 'written' or not entry.get('ok') or not entry.get('files'):
+            return None
+        if entry.get('cleaner') != cleaner_version():
+            return None  # written with another cleaner; write it again from the re-cleaned result
+        root = os.path.dirname(os.path.dirname(self.path))
+        for rel, (size, digest) in entry['files'].items():
+            path = os.path.join(root, rel)
+            try:
+                if os.path.getsize(path) != size or _file_digest(path) != digest:
+                    return None
+            except OSError:
+                return None
+        return entry
+
+    def mark(self, url: str, number: int, stage: str, files: Optional[List[str]] = None, **extra: Any):
+        """Record that `url` (numbered `number`) finished `stage`; `files` are hashed for later checks"""
+        item: Dict[str, Any] = {'url': url, 'number': number, 'stage': stage}
+        item.update(extra)
+        if files is not None:
+            root = os.path.dirname(os.path.dirname(self.path))
+            item['files'] = {os.path.relpath(path, root): [os.path.getsize(path), _file_digest(path)]
+                             for path in files}
+        line = (json.dumps(item, ensure_ascii=False) + '\n').encode('utf-8')
+        key = url_key(url)
+        with self._lock:
+            self._fh.seek(0, os.SEEK_END)
+            self._fh.write(line)
+            self._fh.flush()
+            entry = self._entries.setdefault(key, {})
+            entry.update(item)
+            self._numbers[number] = key
+
+    def close(self):
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+
+def iter_urls_from_file(file_path: str, log_func: Callable[[str, Optional[str]], None],
+                        progress_func: Optional[Callable[[int, int], None]] = None,
+                        progress_every: int = 2000) -> Iterator[str]:
+    """Yield valid URLs from a text file as it is read; I/O and decode errors propagate.
+
+    progress_func(bytes_read, total_bytes) is called every `progress_every` lines and at the end.
+    """
+    total = os.path.getsize(file_path)
+    done = 0
+    with open(file_path, 'rb') as f:
+        for ln, raw in enumerate(f, 1):
+            done += len(raw)
+            s = raw.decode('utf-8').strip()
+            if s and not s.startswith('#'):
+                if is_supported_url(s):
+                    yield s
+                else:
+                    log_func(f"Line {ln}: Invalid URL - {s}", "yellow")
+            if progress_func and ln % progress_every == 0:
+                progress_func(done, total)
+    if progress_func:
+        progress_func(done, total)
+
+
+def read_urls_from_file(file_path: str, log_func: Callable[[str, Optional[str]], None]) -> Optional[List[str]]:
+    """Read URLs from text file"""
+    try:
+        return list(iter_urls_from_file(file_path, log_func))
+    except Exception as e:
+        log_func(f"Error reading file: {e}", "red")
+        return None
+
+
+def sanitize_filename(title: str) -> str:
+    """Sanitizes a string to be used as a filename."""
+    # Remove characters that are illegal in Windows/Unix filenames
+    # This pattern covers: \ / : * ? " < > |
+    cleaned_title = re.sub(r'[\\/:*?"<>|]', '', title)
+    # Replace multiple spaces with a single underscore, and leading/trailing spaces
+    cleaned_title = re.sub(r'\s+', '_', cleaned_title).strip('_')
+    # Limit length to avoid extremely long filenames, common limit is 255 but 100-150 is safer
+    if len(cleaned_title) > 100:
+        cleaned_title = cleaned_title[:100]
+    return cleaned_title
+
+
+def write_video_outputs(r: Dict[str, Any], file_num: int, pad_width: int, dest_dir: str,
+                        folder_prefix: str, subtitle_file_prefix: str, content_file_prefix: str,
+                        selected_lang: str, use_title: bool,
+                        log_func: Callable[[str, Optional[str]], None],
+                        written: Optional[List[str]] = None) -> bool:
+    """Write one video's numbered folder, subtitle files and empty content file.
+
+    The first language in `selected_lang` gets the plain subtitle filename and
+    every further language a '.<lang>' suffix, e.g. bcl-001.txt, bcl-001.vi.txt.
+    Returns True if subtitles were saved, False for error notes or write failures.
+    Paths of files written successfully are appended to `written` if given.
+    """
+    if written is None:
+        written = []
+    numbered_suffix = f"{file_num:0{pad_width}d}"
+
+    current_video_folder = os.path.join(dest_dir, f"{folder_prefix}{numbered_suffix}")
+    os.makedirs(current_video_folder, exist_ok=True)
+    log_func(f"Created folder: {current_video_folder}", "blue")
+
+    # Determine subtitle filename based on checkbox state
+    if use_title:
+        video_title = r.get('title', 'Unknown_Video_Title')
+        cleaned_title = sanitize_filename(video_title)
+        subtitle_stem = f"{numbered_suffix}. {cleaned_title}"
+    else:
+        subtitle_stem = f"{subtitle_file_prefix}{numbered_suffix}"
+    subtitle_filename = f"{subtitle_stem}.txt"
+
+    subtitle_filepath = os.path.join(current_video_folder, subtitle_filename)
+
+    # Content file (empty)
+    content_filename = f"{content_file_prefix}{numbered_suffix}.txt"
+    content_filepath = os.path.join(current_video_folder, content_filename)
+
+    saved = False
+    if r.get('status') != 'success':
+        error_msg = r.get('error', 'Unknown error')
+        with open(subtitle_filepath, 'w', encoding='utf-8') as f:
+            f.write(f"ERROR: {error_msg}\n")
+            f.write(f"URL: {r.get('url', 'N/A')}\n")
+        written.append(subtitle_filepath)
+        log_func(f"⚠ Saved error note for {subtitle_filename} in {os.path.basename(current_video_folder)}", "yellow")
+    else:
+        by_lang = record_subtitles(r)
+        for n, lang in enumerate(parse_languages(selected_lang)):
+            filename = subtitle_filename if n == 0 else f"{subtitle_stem}.{sanitize_filename(lang)}.txt"
+            subtitle_content = by_lang.get(lang, f'No {lang} subtitles available')
+            filepath = os.path.join(current_video_folder, filename)
+            try:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(subtitle_content)
+                written.append(filepath)
+                saved = saved or n == 0
+                log_func(f"✓ Saved subtitle: {filename} - {r.get('title', 'Unknown')}", "green")
+            except Exception as e:
+                log_func(f"✗ Error saving subtitle {filename}: {e}", "red")
+
+    try:
+        with open(content_filepath, 'w', encoding='utf-8') as f:
+            f.write("")
+        written.append(content_filepath)
+        log_func(f"✓ Created empty content file: {content_filename}", "green")
+    except Exception as e:
+        log_func(f"✗ Error creating content file {content_filename}: {e}", "red")
+    return saved
+
+
+THROTTLE_MARKERS = (
+    'http error 429',
+    'too many requests',
+    "sign in to confirm you're not a bot",
+    'sign in to confirm you’re not a bot',
+)
+
+
+def is_throttle_error(message: Optional[str]) -> bool:
+    """True if a yt-dlp error means YouTube is rate limiting or bot-checking us"""
+    text = (message or '').lower()
+    return any(marker in text for marker in THROTTLE_MARKERS)
+
+
+# Seconds a negative result is trusted before the video is tried again, by failure class
+NEGATIVE_CACHE_TTLS: Dict[str, float] = {
+    'no_captions': 3 * 86400,   # auto captions can still appear days after upload
+    'unavailable': 30 * 86400,  # private, removed, terminated, members-only, region-blocked
+    'age_gated': 7 * 86400,     # ignored when a cookie file is given and the last try had none
+    'transient': 0,             # network errors, timeouts, throttling: always retried
+}
+
+UNAVAILABLE_MARKERS = (
+    'private video',
+    'video unavailable',
+    'this video has been removed',
+    'this video is not available',
+    'this video is no longer available',
+    'has been terminated',
+    'members-only',
+    'available to this channel\'s members',
+    'not made this video available in your country',
+)
+
+AGE_GATE_MARKERS = (
+    'confirm your age',
+    'age-restricted',
+    'inappropriate for some users',
+)
+
+
+def classify_failure(r: Dict[str, Any]) -> Optional[str]:
+    """Failure class of a result record ('unavailable', 'age_gated' or 'transient'); None on success"""
+    if r.get('status') == 'success':
+        return None
+    text = (r.get('error') or '').lower()
+    if r.get('status') == 'timeout' or is_throttle_error(text):
+        return 'transient'
+    if any(marker in text for marker in AGE_GATE_MARKERS):
+        return 'age_gated'
+    if any(marker in text for marker in UNAVAILABLE_MARKERS):
+        return 'unavailable'
+    return 'transient'
+
+
+def subtitle_failure(text: Optional[str]) -> Optional[str]:
+    """'no_captions' for a 'No ... subtitles' placeholder, 'transient' for download errors, None for text"""
+    if has_subtitles(text):
+        return None
+    return 'no_captions' if text and text.startswith("No ") else 'transient'
+
+
+class RateLimiter:
+    """Token-bucket limiter for YouTube requests, shared by all workers.
+
+    Tokens refill one at a time up to `burst`; each token takes `interval`
+    seconds plus a fresh random jitter of up to `jitter` seconds, so
+    back-to-back requests are never closer than `interval` and average
+    `interval + jitter / 2` apart. A throttling response (HTTP 429 or a bot
+    check) pauses everyone with an exponential backoff. Waits block on
+    `stop_event`, so setting it wakes them at once. Only real network
+    extractions should acquire; cache hits are free.
+    """
+
+    def __init__(self, interval: float, burst: int = 1, jitter: float = 0.0,
+                 stop_event: Optional[threading.Event] = None,
+                 backoff_base: float = 60.0, backoff_max: float = 900.0):
+        self.interval = max(0.0, interval)
+        self.burst = max(1, burst)
+        self.jitter = max(0.0, jitter)
+        self.stop_event = stop_event or threading.Event()
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._tokens = self.burst
+        self._next_token_at = 0.0  # when the token being refilled arrives; only used below burst
+        self._backoff_until = 0.0
+        self._backoff_level = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_wait_range(cls, min_wait: float, max_wait: float, burst: int = 1,
+                        stop_event: Optional[threading.Event] = None) -> 'RateLimiter':
+        """Keeps the old 'wait min..max seconds' spacing between requests"""
+        return cls(min_wait, burst=burst, jitter=max_wait - min_wait, stop_event=stop_event)
+
+    def _refill_period(self) -> float:
+        return self.interval + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _refill(self, now: float):
+        if self.interval <= 0 and not self.jitter:
+            self._tokens = self.burst
+            return
+        while self._tokens < self.burst and now >= self._next_token_at:
+            self._tokens += 1
+            self._next_token_at += self._refill_period()
+
+    def _drain(self, now: float, tokens: int):
+        """Take `tokens`; a full bucket starts refilling from now"""
+        if self._tokens >= self.burst:
+            self._next_token_at = now + self._refill_period()
+        self._tokens -= tokens
+
+    def pending_delay(self) -> float:
+        """Seconds until the next request may start"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            token_wait = 0.0 if self._tokens >= 1 else self._next_token_at - now
+            return max(token_wait, self._backoff_until - now)
+
+    def acquire(self) -> bool:
+        """Wait for a token. Returns False if cancelled while waiting."""
+        while True:
+            delay = self.pending_delay()
+            if delay <= 0:
+                with self._lock:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._tokens >= 1 and now >= self._backoff_until:
+                        self._drain(now, 1)
+                        break
+                continue
+            if self.stop_event.wait(delay):
+                return False
+        return not self.stop_event.is_set()
+
+    def note_result(self, result: Dict[str, Any]) -> Optional[float]:
+        """Feed back an extraction result. Returns the backoff in seconds if throttled.
+
+        Throttling shows up either as the extraction error or, for subtitle track
+        downloads that got HTTP 429, as result['throttled'] on an otherwise successful record.
+        """
+        with self._lock:
+            if not result.get('throttled') and not is_throttle_error(result.get('error')):
+                if result.get('status') == 'success':
+                    self._backoff_level = 0
+                return None
+            backoff = min(self.backoff_max, self.backoff_base * (2 ** self._backoff_level))
+            self._backoff_level += 1
+            now = time.monotonic()
+            self._backoff_until = max(self._backoff_until, now + backoff)
+            self._drain(now, self._tokens)
+            return backoff
+
+    def budget(self) -> Dict[str, float]:
+        """Tokens available now, average seconds per request and remaining backoff, for ETA estimates"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                'tokens': self._tokens,
+                'burst': self.burst,
+                'seconds_per_request': self.interval + self.jitter / 2,
+                'backoff_seconds': round(max(0.0, self._backoff_until - now), 1),
+            }
+
+
+class RunStats:
+    """Per-stage timings and counters for one pipeline run; safe to update from worker threads.
+
+    Stage times are summed over all workers, so with several workers they
+    can add up to more than the wall-clock time; compare them as shares.
+    """
+
+    STAGES = ('rate_limit', 'extract', 'download', 'clean', 'write', 'journal')
+
+    def __init__(self, total: int = 0):
+        self.started = time.monotonic()
+        self.started_at = time.time()
+        self.total = total
+        self.total_final = True  # False while playlists/channels are still being listed
+        self.processed = self.cached = self.errors = self.saved = self.timed_out = 0
+        self.stage_seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.stage_calls = dict.fromkeys(self.STAGES, 0)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stage_seconds[name] += elapsed
+                self.stage_calls[name] += 1
+
+    def record(self, from_cache: bool, ok: bool, saved: bool, timed_out: bool = False):
+        with self._lock:
+            self.processed += 1
+            self.cached += int(from_cache)
+            self.errors += int(not ok)
+            self.saved += int(saved)
+            self.timed_out += int(timed_out)
+
+    def merge_stages(self, stage_seconds: Dict[str, float], stage_calls: Dict[str, int]):
+        """Add stage timings measured elsewhere, e.g. in an extraction worker process"""
+        with self._lock:
+            for name, seconds in stage_seconds.items():
+                self.stage_seconds[name] += seconds
+                self.stage_calls[name] += stage_calls.get(name, 0)
+
+    def snapshot(self, rate_limiter: Optional[RateLimiter] = None) -> Dict[str, Any]:
+        with self._lock:
+            processed, cached, errors, saved = self.processed, self.cached, self.errors, self.saved
+            timed_out = self.timed_out
+            stage_seconds = dict(self.stage_seconds)
+            stage_calls = dict(self.stage_calls)
+        elapsed = time.monotonic() - self.started
+        remaining = max(0, self.total - processed)
+        cache_hit_ratio = cached / processed if processed else 0.0
+        eta = remaining * elapsed / processed if processed else None
+        budget = rate_limiter.budget() if rate_limiter is not None else None
+        if budget is not None and remaining:
+            # Uncached videos can't go faster than the limiter allows, whatever the observed rate
+            network_left = remaining * (1 - cache_hit_ratio)
+            limiter_eta = (max(0.0, network_left - budget['tokens']) * budget['seconds_per_request']
+                           + budget['backoff_seconds'])
+            eta = max(eta or 0.0, limiter_eta)
+        return {
+            'elapsed_seconds': round(elapsed, 1),
+            'total': self.total,
+            'total_final': self.total_final,
+            'processed': processed,
+            'saved': saved,
+            'cached': cached,
+            'errors': errors,
+            'timed_out': timed_out,
+            'videos_per_minute': round(processed / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            'cache_hit_ratio': round(cache_hit_ratio, 3),
+            'error_rate': round(errors / processed, 3) if processed else 0.0,
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'rate_limit': budget,
+            'stage_seconds': {k: round(v, 3) for k, v in stage_seconds.items()},
+            'stage_avg_ms': {k: round(stage_seconds[k] / n * 1e3, 1) for k, n in stage_calls.items() if n},
+        }
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m {seconds % 60:02d}s"
+
+
+def format_stats(snapshot: Dict[str, Any]) -> str:
+    """Three-line human summary of a RunStats snapshot for progress displays"""
+    total = f"{snapshot['total']}" + ("" if snapshot['total_final'] else "+")
+    lines = [f"{snapshot['processed']}/{total} videos · {snapshot['videos_per_minute']:.1f}/min · "
+             f"cache hits {snapshot['cache_hit_ratio']:.0%} · errors {snapshot['error_rate']:.0%} · "
+             f"ETA {format_duration(snapshot['eta_seconds'])}"]
+    if snapshot.get('timed_out'):
+        lines[0] += f" · {snapshot['timed_out']} timed out"
+    budget = snapshot.get('rate_limit')
+    if budget:
+        line = (f"Rate limit: {budget['tokens']:.1f}/{budget['burst']} requests ready, "
+                f"~{budget['seconds_per_request']:.0f}s each")
+        if budget['backoff_seconds']:
+            line += f", backing off {format_duration(budget['backoff_seconds'])}"
+        lines.append(line)
+    stage_total = sum(snapshot['stage_seconds'].values())
+    if stage_total > 0:
+        names = {'rate_limit': 'rate-limit wait'}
+        lines.append("Time: " + " · ".join(
+            f"{names.get(stage, stage)} {seconds / stage_total:.0%}"
+            for stage, seconds in snapshot['stage_seconds'].items() if seconds))
+    return "\n".join(lines)
+
+
+def timed(stats: Optional[RunStats], stage: str):
+    """stats.stage(stage), or a no-op when no stats are being collected"""
+    return stats.stage(stage) if stats is not None else contextlib.nullcontext()
+
+
+LOG_COLOR_LEVELS = {'red': logging.ERROR, 'yellow': logging.WARNING}
+
+
+def open_file_log(path: str = 'ebs_pipeline.log', max_bytes: int = 5 * 1024 * 1024,
+                  backups: int = 3) -> logging.Logger:
+    """Logger writing to a size-rotated file (path, path.1 ... path.N); safe to call from any thread"""
+    from logging.handlers import RotatingFileHandler
+    logger = logging.getLogger(f"ebs_pipeline.{os.path.abspath(path)}")
+    if not logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s %(threadName)s %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def log_to_file(logger: logging.Logger, message: str, color: Optional[str] = None):
+    """Writes a (message, color) log call to a file logger at the matching level"""
+    logger.log(LOG_COLOR_LEVELS.get(color, logging.INFO), message.strip('\n'))
+
+
+# ====== Pipeline Engine ======
+LogFunc = Callable[[str, Optional[str]], None]
+ProgressFunc = Callable[[int, int, str], None]
+VideoFunc = Callable[[Dict[str, Any]], None]
+StatusFunc = Callable[[str, str], None]
+StatsFunc = Callable[[Dict[str, Any]], None]
+
+
+COLLECTION_PAD_WIDTH = 4  # auto padding when the input includes playlists or channels
+
+
+@dataclass
+class PipelineConfig:
+    """Everything one pipeline run needs; filled in by the GUI form or CLI flags"""
+    urls: List[str]
+    dest_dir: str = field(default_factory=lambda: os.path.join(os.getcwd(), "Downloaded-Sub"))
+    start_num: int = 1
+    pad_width: int = 0  # 0 = wide enough for the largest number
+    folder_prefix: str = "Ebs-"
+    subtitle_file_prefix: str = "bcl-"
+    content_file_prefix: str = "Content-"
+    use_title: bool = False
+    selected_lang: str = "en"
+    cookie_file_path: Optional[str] = None
+    rate_limit_enabled: bool = True
+    min_wait_time: int = 20
+    max_wait_time: int = 25
+    burst: int = 1
+    num_workers: int = 1
+    results_path: str = 'youtube_results.jsonl'
+    subtitle_cache_dir: Optional[str] = 'subtitle_cache'  # None disables the raw subtitle cache
+    subtitle_cache_max_bytes: int = 512 * 1024 * 1024
+    run_summary_dir: Optional[str] = 'run_summaries'  # one JSON per run with timings; None disables
+    resume: bool = True  # False starts the batch's checkpoint manifest over
+    video_timeout: Optional[float] = 180.0  # seconds per video for extraction + track downloads; None = no limit
+    use_processes: bool = False  # run yt-dlp in num_workers worker processes instead of worker threads
+    negative_ttls: Dict[str, float] = field(default_factory=lambda: dict(NEGATIVE_CACHE_TTLS))
+    extraction_profile: str = 'captions'  # 'video' = full yt-dlp extraction with all formats resolved
+
+    def languages(self) -> List[str]:
+        return parse_languages(self.selected_lang)
+
+    def resolved_pad_width(self) -> int:
+        if self.pad_width > 0:
+            return self.pad_width
+        if any(is_collection_url(url) for url in self.urls):
+            # The final count is unknown until playlists/channels are listed
+            return max(COLLECTION_PAD_WIDTH, len(str(self.start_num + len(self.urls) - 1)))
+        return max(1, len(str(self.start_num + len(self.urls) - 1)))
+
+
+class PipelineEngine:
+    """Runs a batch: cache lookup, rate-limited extraction and per-video output.
+
+    Front ends talk to it only through callbacks: log_func(message, color),
+    progress_func(current, total, description) and video_func(event), which
+    receives one small dict per finished video. status_func(url, status) follows
+    each URL through 'running' or 'cached' to 'done' / 'failed', and
+    stats_func(snapshot) gets RunStats.snapshot() after every video. Each
+    extraction runs under config.video_timeout; a video that overruns it is
+    abandoned and recorded with status 'timeout'. Setting stop_event cancels
+    the run: in-flight extractions are abandoned within a fraction of a second
+    and limiter waits wake immediately.
+    """
+
+    def __init__(self, config: PipelineConfig, log_func: LogFunc,
+                 progress_func: Optional[ProgressFunc] = None, video_func: Optional[VideoFunc] = None,
+                 stop_event: Optional[threading.Event] = None, status_func: Optional[StatusFunc] = None,
+                 stats_func: Optional[StatsFunc] = None):
+        self.config = config
+        self.log = log_func
+        self.progress = progress_func or (lambda current, total, description: None)
+        self.video_func = video_func
+        self.status = status_func or (lambda url, status: None)
+        self.stats_func = stats_func
+        self.stats = RunStats()
+        self.stop_event = stop_event or threading.Event()
+        self.rate_limiter: Optional[RateLimiter] = None
+        if config.rate_limit_enabled:
+            self.rate_limiter = RateLimiter.from_wait_range(config.min_wait_time, config.max_wait_time,
+                                                            config.burst, self.stop_event)
+        self.subtitle_cache: Optional[SubtitleCache] = None
+        # Abandoned extractions keep their YoutubeDL; the session must not close it under them
+        self.caller = BoundedCaller(on_abandon=default_ydl_session().detach_thread)
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_slots: Optional[threading.BoundedSemaphore] = None  # processes not running a call
+
+    def cancel(self):
+        self.stop_event.set()
+
+    def _fetch(self, url: str, languages: List[str], future: Optional[Future] = None) -> Dict[str, Any]:
+        """get_video_info on this thread, or the result of an extraction submitted to the process pool"""
+        config = self.config
+        if future is None:
+            return get_video_info(url, self.log, config.selected_lang, config.cookie_file_path,
+                                  subtitle_cache=self.subtitle_cache, languages=languages, stats=self.stats,
+                                  profile=config.extraction_profile)
+        try:
+            r, logs, stage_seconds, stage_calls, cache_bytes = future.result()
+        except BrokenProcessPool as e:
+            self.log(f"Extraction process failed for {url}: {e}", "red")
+            return {'url': url, 'status': 'error', 'error': f'Error: extraction process failed ({e})'}
+        for message, color in logs:
+            self.log(message, color)
+        self.stats.merge_stages(stage_seconds, stage_calls)
+        if cache_bytes and self.subtitle_cache is not None:
+            self.subtitle_cache.add_external(cache_bytes)
+        return r
+
+    def _submit_extraction(self, url: str, languages: List[str]) -> Optional[Future]:
+        """Submit to the process pool once a worker process is free; None if cancelled while waiting.
+
+        A slot is only given back when the process really finishes, including calls
+        the caller gave up on, so the per-video deadline never covers time spent
+        queued behind an abandoned extraction.
+        """
+        config = self.config
+        waiting = False
+        while not self._process_slots.acquire(timeout=0.2):
+            if self.stop_event.is_set():
+                return None
+            if not waiting:
+                waiting = True
+                self.log(f"⏳ All extraction processes are busy with abandoned videos; {url} waits for one.",
+                         "yellow")
+        try:
+            future = self.process_pool.submit(extract_in_process, url, config.selected_lang,
+                                              config.cookie_file_path, languages, config.extraction_profile)
+        except BrokenProcessPool as e:
+            self._process_slots.release()
+            future = Future()
+            future.set_exception(e)
+            return future
+        future.add_done_callback(lambda _: self._process_slots.release())
+        return future
+
+    def _extract_one(self, url: str, results_store: ResultsStore) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Resolves one URL from the results journal or yt-dlp. Safe to run on worker threads.
+
+        Returns (result, from_cache); result is None if the run was cancelled first.
+        """
+        config = self.config
+        if self.stop_event.is_set():
+            return None, False
+        self.log(f"Processing URL: {url}", None)
+
+        vid = extract_video_id(url)
+        languages = config.languages()
+
+        r = None  # Initialize r
+        missing = languages
+        spent = 0.0  # seconds of the per-video budget used by bounded calls so far
+        cached_item = results_store.get(vid)
+        if cached_item is not None:
+            # A successful cached result is reused for every language it already has.
+            # Languages it lacks come from the raw subtitle cache, and only what is still
+            # missing after that is fetched. We also re-extract if the user wants to use
+            # title for filename and we don't have title.
+            if cached_item.get('status') == 'success' and (not config.use_title or cached_item.get('title')):
+                r = dict(cached_item, url=cached_item.get('url') or url)
+                by_lang = record_subtitles(r)
+                if r.get('cleaner') != cleaner_version():
+                    self._reclean_from_subtitle_cache(r, by_lang, vid)
+                if any(not has_subtitles(by_lang.get(lang)) for lang in languages):
+                    self._fill_from_subtitle_cache(r, by_lang, vid, languages)
+                missing = [lang for lang in languages if not has_subtitles(by_lang.get(lang))]
+                # Languages recently found to have no captions count as done until their TTL runs out
+                checked_at = r.get('subtitles_checked_at') or {}
+                no_captions = [lang for lang in missing
+                               if self._negative_is_fresh(subtitle_failure(by_lang.get(lang)), checked_at.get(lang))]
+                missing = [lang for lang in missing if lang not in no_captions]
+                if missing and self._negative_is_fresh(r.get('failure'), r.get('checked_at'),
+                                                       r.get('checked_with_cookies', False)):
+                    # The last fetch of these languages failed for the whole video (e.g. it went private)
+                    self.log(f"↷ Not fetching {', '.join(missing)} for {url}: "
+                             f"{r['failure'].replace('_', '-')} when last checked.", "yellow")
+                    missing = []
+                if missing and track_listing_is_fresh(r.get('track_listing')):
+                    # The signed track URLs from the last extraction are still valid, so missing
+                    # or previously failed tracks are downloaded without another extract_info
+                    started = time.monotonic()
+                    try:
+                        fetched = self.caller.call(self._download_from_track_listing, r, vid, missing,
+                                                   timeout=config.video_timeout, stop_event=self.stop_event)
+                    except CallCancelled:
+                        self.log(f"Cancelled while downloading subtitles: {url}", "yellow")
+                        return None, False
+                    except DeadlineExceeded:
+                        # Keep what the cache already had; the extraction below would get no time left
+                        self.log(f"⌛ {url}: subtitle downloads timed out after {config.video_timeout:.0f} "
+                                 f"seconds; keeping the cached result.", "red")
+                        self._set_languages(r, by_lang, languages)
+                        self.status(url, 'cached')
+                        if r != cached_item:
+                            with timed(self.stats, 'journal'):
+                                results_store.commit(r)
+                        return r, True
+                    spent += time.monotonic() - started
+                    missing = self._apply_track_listing_downloads(r, by_lang, fetched)
+                self._set_languages(r, by_lang, languages)
+                if not missing:
+                    if no_captions:
+                        self.log(f"↷ Using cached result for: {url} (no {', '.join(no_captions)} captions "
+                                 f"when last checked)", "blue")
+                    else:
+                        self.log(f"↷ Using cached result for: {url}", "blue")
+                    self.status(url, 'cached')
+                    if r != cached_item:
+                        with timed(self.stats, 'journal'):
+                            results_store.commit(r)
+                    return r, True
+                self.log(f"Cached result for {url} has no {', '.join(missing)} subtitles; fetching them.", "yellow")
+            elif cached_item.get('status') != 'success' and self._negative_is_fresh(
+                    cached_item.get('failure'), cached_item.get('checked_at'),
+                    cached_item.get('checked_with_cookies', False)):
+                # Private, removed or age-gated videos are skipped without any network traffic
+                self.log(f"↷ Skipping {url}: {cached_item['failure'].replace('_', '-')} when last checked "
+                         f"({cached_item.get('error', 'unknown error')})", "yellow")
+                self.status(url, 'cached')
+                return dict(cached_item, url=cached_item.get('url') or url), True
+            else:
+                self.log(f"Cached result for {url} needs re-extraction (title missing or error).", "yellow")
+
+        # Only real network extractions spend rate-limit tokens
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.pending_delay()
+            if delay >= 1:
+                self.log(f"⏳ Waiting {delay:.0f}+ seconds for the rate limiter.", "yellow")
+            with timed(self.stats, 'rate_limit'):
+                acquired = self.rate_limiter.acquire()
+            if not acquired:
+                return None, False
+        self.status(url, 'running')
+        try:
+            future = None
+            if self.process_pool is not None:
+                future = self._submit_extraction(url, missing)
+                if future is None:
+                    raise CallCancelled()
+            timeout = None if config.video_timeout is None else max(config.video_timeout - spent, 0.001)
+            fresh = self.caller.call(self._fetch, url, missing, future, timeout=timeout, stop_event=self.stop_event)
+        except CallCancelled:
+            self.log(f"Cancelled while extracting: {url}", "yellow")
+            return None, False
+        except DeadlineExceeded:
+            error = f"Timed out after {config.video_timeout:.0f} seconds"
+            self.log(f"⌛ {url}: {error}; moving on.", "red")
+            fresh = {'url': url, 'status': 'timeout', 'error': error}
+        checked_at = time.time()
+        if fresh.get('status') == 'success':
+            fresh['subtitles_checked_at'] = dict.fromkeys(missing, checked_at)
+        else:
+            fresh.update(failure=classify_failure(fresh), checked_at=checked_at,
+                         checked_with_cookies=bool(config.cookie_file_path))
+        if r is not None and fresh.get('status') == 'success':
+            # Merge the newly fetched languages into the cached record
+            by_lang = record_subtitles(r)
+            by_lang.update(fresh['subtitles_by_lang'])
+            tracks = dict(r.get('subtitle_tracks') or {})
+            tracks.update(fresh['subtitle_tracks'])
+            checked = dict(r.get('subtitles_checked_at') or {})
+            checked.update(fresh['subtitles_checked_at'])
+            r.update(title=fresh['title'], video_id=fresh['video_id'], subtitle_tracks=tracks,
+                     subtitles_checked_at=checked, track_listing=fresh['track_listing'])
+            for key in ('failure', 'checked_at', 'checked_with_cookies'):
+                r.pop(key, None)
+            self._set_languages(r, by_lang, languages)
+            self.log(f"✓ OK - {url}", "green")
+        elif r is not None:
+            # Only the missing languages were being fetched: keep the cached ones (and their
+            # files), mark just those as failed and remember why for the negative cache
+            by_lang = record_subtitles(r)
+            for lang in missing:
+                by_lang[lang] = f"Error downloading subtitles for {lang}: {fresh.get('error', 'unknown error')}"
+            r.update(failure=fresh['failure'], checked_at=checked_at,
+                     checked_with_cookies=fresh['checked_with_cookies'])
+            self._set_languages(r, by_lang, languages)
+            self.log(f"✗ Error fetching {', '.join(missing)} subtitles - {url}; keeping the cached result.", "red")
+        else:
+            r = fresh
+            r['extracted_lang'] = languages[0]  # Store the language used for extraction
+            r.setdefault('url', url)  # Ensure url is present
+            status_msg = f"{'✓ OK' if r.get('status') == 'success' else '✗ Error'} - {url}"
+            self.log(status_msg, "green" if r.get('status') == 'success' else "red")
+        if self.rate_limiter is not None:
+            backoff = self.rate_limiter.note_result(fresh)
+            if backoff:
+                self.log(f"YouTube is throttling requests. Backing off for {backoff:.0f} seconds.", "red")
+        fresh.pop('throttled', None)  # a signal for the limiter, not part of the stored result
+        with timed(self.stats, 'journal'):
+            results_store.commit(r)
+        return r, False
+
+    def _negative_is_fresh(self, failure: Optional[str], checked_at: Optional[float],
+                           checked_with_cookies: bool = True) -> bool:
+        """True if a cached negative result of this class is still within its TTL"""
+        if not failure or not checked_at:
+            return False
+        if failure == 'age_gated' and self.config.cookie_file_path and not checked_with_cookies:
+            return False  # the cookie file may get past the age gate this time
+        return time.time() - checked_at < self.config.negative_ttls.get(failure, 0)
+
+    @staticmethod
+    def _set_languages(r: Dict[str, Any], by_lang: Dict[str, str], languages: List[str]):
+        """Store per-language text; 'subtitles' / 'extracted_lang' keep naming this run's first language"""
+        r['subtitles_by_lang'] = by_lang
+        r['subtitles'] = by_lang.get(languages[0], f"No {languages[0]} subtitles available")
+        r['extracted_lang'] = languages[0]
+
+    def _download_from_track_listing(self, r: Dict[str, Any], vid: Optional[str],
+                                     missing: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Download missing languages from the record's stored track listing. Runs under the bounded caller."""
+        info = track_listing_info(vid, r['track_listing'])
+        fetched = {}
+        for lang in missing:
+            try:
+                fetched[lang] = fetch_subtitles(info, lang, cache=self.subtitle_cache, stats=self.stats)
+            except Exception:
+                fetched[lang] = {'text': None}
+        return fetched
+
+    def _apply_track_listing_downloads(self, r: Dict[str, Any], by_lang: Dict[str, str],
+                                       fetched: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Merge downloaded languages into the record; returns those still missing"""
+        tracks = dict(r.get('subtitle_tracks') or {})
+        still_missing = []
+        for lang, result in fetched.items():
+            if result.get('throttled') and self.rate_limiter is not None:
+                backoff = self.rate_limiter.note_result(result)
+                if backoff:
+                    self.log(f"YouTube is throttling subtitle downloads. Backing off for {backoff:.0f} seconds.", "red")
+            if has_subtitles(result['text']):
+                by_lang[lang] = result['text']
+                tracks[lang] = {k: result[k] for k in ('kind', 'lang', 'ext')}
+                self.log(f"↷ Downloaded {lang} subtitles from the cached track listing: {r.get('url')}", "blue")
+            else:
+                still_missing.append(lang)
+        r['subtitle_tracks'] = tracks
+        return still_missing
+
+    def _reclean_from_subtitle_cache(self, r: Dict[str, Any], by_lang: Dict[str, str], vid: Optional[str]):
+        """Re-derive stored text with the current cleaner from the raw payloads. No network.
+
+        The record is only marked with the new cleaner version once every language
+        with text was redone; otherwise the old text stays and it is tried again next run.
+        """
+        if self.subtitle_cache is None or not vid:
+            return
+        tracks = r.get('subtitle_tracks') or {}
+        redone = 0
+        complete = True
+        for lang, old_text in list(by_lang.items()):
+            if not has_subtitles(old_text):
+                continue
+            track = tracks.get(lang)
+            payload = self.subtitle_cache.get(vid, track['lang'], track['kind'], track['ext']) if track else None
+            if payload is None:
+                complete = False
+                continue
+            with timed(self.stats, 'clean'):
+                text = subtitle_payload_to_text(payload, track['ext'])
+                cleaned = clean_subtitles(text) if text else None
+            if cleaned is not None:
+                by_lang[lang] = cleaned
+                redone += 1
+        if redone:
+            self.log(f"↷ Re-cleaned {redone} subtitle track(s) from subtitle cache: {r.get('url')}", "blue")
+        if complete:
+            r['cleaner'] = cleaner_version()
+
+    def _fill_from_subtitle_cache(self, r: Dict[str, Any], by_lang: Dict[str, str], vid: Optional[str],
+                                  languages: List[str]):
+        """Re-derive missing languages from raw cached subtitles, e.g. after adding a language. No network."""
+        if self.subtitle_cache is None or not vid:
+            return
+        tracks = dict(r.get('subtitle_tracks') or {})
+        for lang in languages:
+            if has_subtitles(by_lang.get(lang)):
+                continue
+            hit = self.subtitle_cache.find(vid, lang)
+            with timed(self.stats, 'clean'):
+                text = subtitle_payload_to_text(hit['payload'], hit['ext']) if hit else None
+                cleaned = clean_subtitles(text) if text else None
+            if cleaned is not None:
+                by_lang[lang] = cleaned
+                tracks[lang] = {'kind': hit['kind'], 'lang': hit['lang'], 'ext': hit['ext']}
+                self.log(f"↷ Rebuilt {lang} subtitles from subtitle cache: {r.get('url')}", "blue")
+        r['subtitle_tracks'] = tracks
+
+    def _finish_stats(self, summary: Dict[str, Any]):
+        """Adds the final stats to the summary and writes the run summary JSON"""
+        config = self.config
+        summary['stats'] = snapshot = self.stats.snapshot(self.rate_limiter)
+        if self.stats_func:
+            self.stats_func(snapshot)
+        if not config.run_summary_dir:
+            return
+        record = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(self.stats.started_at)),
+            'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'yt_dlp_version': yt_dlp_version(),
+            'python_version': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {
+                'inputs': len(config.urls),
+                'languages': config.languages(),
+                'workers': config.num_workers,
+                'rate_limit_enabled': config.rate_limit_enabled,
+                'min_wait_time': config.min_wait_time,
+                'max_wait_time': config.max_wait_time,
+                'burst': config.burst,
+            },
+            'result': {k: summary[k] for k in ('total', 'processed', 'saved', 'added', 'cancelled')},
+            'stats': snapshot,
+        }
+        stem = os.path.join(config.run_summary_dir,
+                            time.strftime('run-%Y%m%d-%H%M%S', time.localtime(self.stats.started_at)))
+        try:
+            os.makedirs(config.run_summary_dir, exist_ok=True)
+            for n in itertools.count(1):
+                path = f"{stem}.json" if n == 1 else f"{stem}-{n}.json"
+                try:
+                    f = open(path, 'x', encoding='utf-8')
+                except FileExistsError:
+                    continue
+                with f:
+                    json.dump(record, f, ensure_ascii=False, indent=2)
+                break
+            summary['run_summary'] = path
+            self.log(f"Run summary written to {path}", "blue")
+        except OSError as e:
+            self.log(f"Could not write run summary in {config.run_summary_dir}: {e}", "yellow")
+
+    def _iter_video_urls(self, counter: Dict[str, Any]) -> Iterator[str]:
+        """Input URLs with playlists/channels expanded lazily into their videos.
+
+        While counter['listing'] is True (the input has playlists or channels),
+        counter['total'] grows as videos are discovered; it is cleared once
+        every input has been enumerated.
+        """
+        config = self.config
+        seen = set()
+        for url in config.urls:
+            if self.stop_event.is_set():
+                break
+            if not is_collection_url(url):
+                key = url_key(url)
+                if key in seen:
+                    self.log(f"Skipping duplicate of an earlier URL: {url}", "yellow")
+                    continue
+                seen.add(key)
+                if counter['listing']:
+                    counter['total'] += 1
+                yield url
+                continue
+            self.log(f"Listing videos of {url}", "blue")
+            found = 0
+            for vid in iter_collection_video_ids(url, self.log, config.cookie_file_path,
+                                                 stop_event=self.stop_event):
+                if vid in seen:
+                    continue
+                seen.add(vid)
+                found += 1
+                counter['total'] += 1
+                yield canonical_video_url(vid)
+            self.log(f"Found {found} new videos in {url}", "blue")
+        counter['listing'] = False
+
+    def run(self) -> Dict[str, Any]:
+        """Process every URL. Returns a summary dict; critical errors propagate to the caller."""
+        config = self.config
+        if any(is_collection_url(url) for url in config.urls):
+            counter = {'total': 0, 'listing': True}
+        else:
+            counter = {'total': len(UrlList(config.urls)), 'listing': False}
+        urls = self._iter_video_urls(counter)
+        pad_width = config.resolved_pad_width()
+        summary = {'total': len(config.urls), 'processed': 0, 'saved': 0, 'added': 0, 'cancelled': False,
+                   'dest_dir': config.dest_dir}
+
+        self.stats = stats = RunStats(counter['total'])
+
+        def total_label() -> str:
+            return f"{counter['total']}+" if counter['listing'] else str(counter['total'])
+
+        self.log("\n--- Starting YouTube Subtitle Extraction ---", "blue")
+        self.progress(0, len(config.urls), "Preparing...")
+        os.makedirs(config.dest_dir, exist_ok=True)
+
+        results_store = ResultsStore(config.results_path)
+        manifest = CheckpointManifest.for_config(config, fresh=not config.resume)
+        summary['checkpoint'] = manifest.path
+        if config.subtitle_cache_dir:
+            try:
+                self.subtitle_cache = SubtitleCache(config.subtitle_cache_dir, config.subtitle_cache_max_bytes)
+            except OSError as e:
+                self.log(f"Subtitle cache disabled ({e}).", "yellow")
+        try:
+            if results_store.imported:
+                self.log(f"Imported {results_store.imported} results from youtube_results.json "
+                         f"into the results journal.", "green")
+            self.log(f"Loaded results journal ({len(results_store)} cached videos).", "blue")
+            if len(manifest) and config.resume:
+                self.log(f"Resuming batch: {manifest.done_count()} videos already written "
+                         f"({os.path.basename(manifest.path)}).", "blue")
+            if config.use_processes:
+                # Workers stay threads (cache, rate limiting, numbering and writes stay here);
+                # only the CPU-heavy yt-dlp extraction moves to the processes
+                pool_size = config.num_workers * PROCESS_POOL_FACTOR
+                self.process_pool = ProcessPoolExecutor(
+                    max_workers=pool_size, mp_context=multiprocessing.get_context(PROCESS_START_METHOD),
+                    initializer=_init_extraction_process,
+                    initargs=(config.subtitle_cache_dir if self.subtitle_cache is not None else None,
+                              config.subtitle_cache_max_bytes))
+                self._process_slots = threading.BoundedSemaphore(pool_size)
+                self.log(f"Extracting in up to {pool_size} worker processes ({config.num_workers} at a time).",
+                         "blue")
+
+            def process(i: int, url: str) -> Optional[bool]:
+                # Each video is committed and written out as soon as it finishes, so nothing
+                # but a saved/not-saved flag outlives it and a cancel keeps finished outputs.
+                # Numbering follows input position, so workers may finish out of order; a
+                # resumed batch keeps the numbers its checkpoint manifest handed out
+                file_num = manifest.number_for(url, config.start_num + i)
+                done = manifest.completed(url)
+                if done is not None:
+                    self.log(f"↷ Already written: {done.get('title') or url} (#{file_num})", "blue")
+                    stats.record(True, True, True)
+                    self.status(url, 'done')
+                    if self.video_func:
+                        self.video_func({'index': i, 'number': file_num, 'url': url,
+                                         'video_id': done.get('video_id'), 'title': done.get('title'),
+                                         'status': 'success', 'error': None, 'saved': True, 'resumed': True})
+                    return True
+                manifest.mark(url, file_num, 'assigned')
+                r, from_cache = self._extract_one(url, results_store)
+                if r is None:
+                    return None
+                if r.get('status') == 'success':
+                    manifest.mark(url, file_num, 'extracted')
+                written: List[str] = []
+                with timed(stats, 'write'):
+                    saved = write_video_outputs(r, file_num, pad_width, config.dest_dir, config.folder_prefix,
+                                                config.subtitle_file_prefix, config.content_file_prefix,
+                                                config.selected_lang, config.use_title, self.log, written)
+                    manifest.mark(url, file_num, 'written', files=written, ok=saved and r.get('status') == 'success',
+                                  video_id=r.get('video_id'), title=r.get('title'), cleaner=cleaner_version())
+                stats.record(from_cache, r.get('status') == 'success', saved, timed_out=r.get('status') == 'timeout')
+                if r.get('status') != 'success' or not saved:
+                    self.status(url, 'failed')
+                elif not from_cache:
+                    self.status(url, 'done')
+                if self.video_func:
+                    self.video_func({'index': i, 'number': file_num, 'url': url,
+                                     'video_id': r.get('video_id'), 'title': r.get('title'),
+                                     'status': r.get('status'), 'error': r.get('error'), 'saved': saved})
+                return saved
+
+            def record(outcome: Optional[bool]):
+                if outcome is not None:
+                    summary['processed'] += 1
+                    summary['saved'] += int(outcome)
+                    stats.total, stats.total_final = counter['total'], not counter['listing']
+                    if self.stats_func:
+                        self.stats_func(stats.snapshot(self.rate_limiter))
+
+            if config.num_workers <= 1:
+                # Process each URL
+                for i, url in enumerate(urls):
+                    if self.stop_event.is_set():
+                        break
+                    self.progress(i, counter['total'], f"Processing video {i + 1}/{total_label()}: {url}")
+                    record(process(i, url))
+            else:
+                self.log(f"Running extraction with {config.num_workers} parallel workers.", "blue")
+                # Keep at most two URLs per worker in flight so cancellation only waits for running items
+                # Pulling the next URL may list the next playlist page while workers keep extracting
+                pending_urls = enumerate(urls)
+                in_flight: Dict[Future, int] = {}
+                completed = 0
+                with ThreadPoolExecutor(max_workers=config.num_workers, thread_name_prefix="ebs-extract") as pool:
+                    def submit_next():
+                        for i, url in pending_urls:
+                            in_flight[pool.submit(process, i, url)] = i
+                            return
+
+                    try:
+                        for _ in range(config.num_workers * 2):
+                            submit_next()
+                        while in_flight:
+                            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                            for future in finished:
+                                in_flight.pop(future)
+                                record(future.result())
+                                completed += 1
+                                self.progress(completed, counter['total'],
+                                              f"Processed {completed}/{total_label()} videos")
+                                if not self.stop_event.is_set():
+                                    submit_next()
+                    except BaseException:
+                        # A fatal error must not leave the pool's exit waiting on limiter backoffs
+                        # and per-video deadlines: stop the running videos, drop the queued ones
+                        self.stop_event.set()
+                        for future in in_flight:
+                            future.cancel()
+                        raise
+
+            summary['total'] = stats.total = total_urls = counter['total']
+            stats.total_final = True
+            summary['added'] = results_store.added
+            summary['timed_out'] = stats.timed_out
+            self.log(f"✓ Committed results (added {results_store.added}) to "
+                     f"{os.path.basename(results_store.path)}", "green")
+            if self.stop_event.is_set():
+                summary['cancelled'] = True
+                self.log(f"Pipeline cancelled. Files for {summary['processed']}/{total_urls} finished videos "
+                         f"were kept under: {config.dest_dir}", "red")
+                self._finish_stats(summary)
+                return summary
+
+            self.progress(total_urls, total_urls, "Completed extraction.")
+            self.log(f"\n→ Successfully processed {summary['saved']}/{total_urls} videos with files saved "
+                     f"to subfolders under: {config.dest_dir}", "green")
+            self._finish_stats(summary)
+            return summary
+        finally:
+            if self.process_pool is not None:
+                # Don't wait: an abandoned extraction keeps its process busy until its socket times out
+                try:
+                    self.process_pool.shutdown(wait=False, cancel_futures=True)
+                except TypeError:  # Python 3.8 has no cancel_futures
+                    self.process_pool.shutdown(wait=False)
+                self.process_pool = None
+            self.caller.close()
+            manifest.close()
+            results_store.close()
+            default_ydl_session().close()
+            # The shared client outlives the run; drop the sockets of workers and helpers that exited
+            default_http_client().prune_dead_threads()
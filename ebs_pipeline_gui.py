@@ -1,235 +1,236 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
+import multiprocessing
 import os
-import random
-import re
 import subprocess
 import sys
 import threading
-import time
-import json
-from typing import Optional, List, Dict, Any, Callable
-
-
-os.environ.pop("SSLKEYLOGFILE", None)
-
-try:
-    import certifi
-
-    os.environ.setdefault("SSL_CERT_FILE", certifi.where())
-except Exception:
-    pass
-
-# Check for yt-dlp availability
-YTDLP_AVAILABLE = False
-try:
-    import yt_dlp
-
-    YTDLP_AVAILABLE = True
-except ImportError:
-    pass
-
-
-# ====== Helper Functions ======
-def extract_video_id(url):
-    """Extract video ID from YouTube URL"""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/v\/([a-zA-Z0-9_-]{11})',
-    ]
-    for p in patterns:
-        m = re.search(p, url)
-        if m:
-            return m.group(1)
-    return None
-
-
-def download_subtitle_content(url):
-    """Download subtitle content from URL"""
-    try:
-        import urllib.request
-        with urllib.request.urlopen(url) as resp:
-            raw = resp.read().decode('utf-8')
-            s = raw.strip()
-            if s.startswith('{') or s.startswith('['):
-                try:
-                    data = json.loads(raw)
-                    if isinstance(data, dict) and "events" in data:
-                        lines = []
-                        for ev in data["events"]:
-                            if "segs" in ev:
-                                line = ''.join(seg.get("utf8", "") for seg in ev["segs"]).strip()
-                                if line:
-                                    lines.append(line)
-                        return "\n".join(lines)
-                    if isinstance(data, list):
-                        lines = [it.get("text", "") for it in data if it.get("text", "")]
-                        return "\n".join(lines)
-                    return raw
-                except Exception:
-                    return raw
-            return raw
-    except Exception:
-        return ""
-
-
-def clean_subtitles(subtitle_content):
-    """Clean subtitle content"""
-    if not subtitle_content:
-        return "No subtitle content available"
-    out = []
-    for line in subtitle_content.splitlines():
-        line = line.strip()
-        if (not re.match(r'^\d+$', line)
-                and not re.match(r'^\d{2}:\d{2}:\d{2}', line)
-                and not re.match(r'^(WEBVTT|NOTE)', line)
-                and line and line != '--'):
-            line = re.sub(r'<[^>]+>', '', line)
-            line = re.sub(r'&[a-zA-Z]+;', '', line)
-            if line and (not out or out[-1] != line):
-                out.append(line)
-    return "\n".join(out) or "Unable to extract subtitle content"
-
-
-
-def get_subtitles(info: Dict[str, Any], lang_code: str):
-    """Get subtitles for a specific language from video info"""
-    try:
-        subs = info.get('subtitles', {}) or {}
-        auto = info.get('automatic_captions', {}) or {}
-
-        # Prioritize manual subtitles for the specified language
-        if lang_code in subs:
-            url = subs[lang_code][0]['url']
-            text = download_subtitle_content(url)
-            if text:
-                return clean_subtitles(text)
-
-        # Then try automatic captions for the specified language
-        # Include common variants for English, otherwise use exact code
-        lang_codes_to_try = [lang_code]
-        if lang_code.lower() == 'en':
-            lang_codes_to_try = ['en', 'en-US', 'en-GB']
-        # Add other common variants if needed, e.g., for Portuguese: ['pt', 'pt-BR', 'pt-PT']
-
-        for lc in lang_codes_to_try:
-            if lc in auto:
-                url = auto[lc][0]['url']
-                text = download_subtitle_content(url)
-                if text:
-                    return clean_subtitles(text)
-
-        return f"No {lang_code} subtitles available"
-    except Exception as e:
-        return f"Error downloading subtitles for {lang_code}: {e}"
-
-
-# MODIFIED: get_video_info to accept selected_lang and cookie_file_path
-def get_video_info(url: str, log_func: Callable[[str, Optional[str]], None],
-                   selected_lang: str = 'en', cookie_file_path: Optional[str] = None):
-    """Get video information and subtitles"""
-    if not YTDLP_AVAILABLE:
-        return {'url': url, 'status': 'error', 'error': 'yt-dlp is not available.'}
-    try:
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extractaudio': False,
-            'extract_flat': False,
-            # Removed sleep_interval and max_sleep_interval here as they are now handled by the GUI logic
-            'retries': 5,
-            # Ensure yt-dlp extracts subtitle metadata, even if we download content ourselves
-            'writesubtitles': True,
-            'writeautomaticsub': True,
-            'subtitleslangs': [selected_lang],  # Hint yt-dlp to look for this language
-        }
-        if cookie_file_path and os.path.exists(cookie_file_path):
-            ydl_opts['cookiefile'] = cookie_file_path
-            log_func(f"Using cookie file: {os.path.basename(cookie_file_path)}", "blue")
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            return {
-                'title': info.get('title', 'No title'),
-                'video_id': info.get('id', 'unknown'),
-                'url': url,
-                'subtitles': get_subtitles(info, selected_lang),  # Call the modified function
-                'status': 'success'
-            }
-    except Exception as e:
-        log_func(f"Error getting info for {url}: {e}", "red")
-        return {'url': url, 'status': 'error', 'error': f'Error: {e}'}
-
-
-def load_existing_index(results_path='youtube_results.json'):
-    """Load existing results from JSON file"""
-    if not os.path.exists(results_path):
-        return {}, []
-    try:
-        with open(results_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        idx, ordered = {}, []
-        for item in data:
-            vid = item.get('video_id') or extract_video_id(item.get('url', '')) or ''
-            if vid and vid not in idx:
-                idx[vid] = item
-                ordered.append(item)
-        return idx, ordered
-    except Exception:
-        return {}, []
-
-
-def save_results_merge(new_results: List[Dict[str, Any]], log_func: Callable[[str, Optional[str]], None],
-                       output_file='youtube_results.json'):
-    """Save results to JSON file"""
-    existing_index, ordered = load_existing_index(output_file)
-    appended = 0
-    for item in new_results:
-        vid = item.get('video_id') or extract_video_id(item.get('url', '')) or item.get('url')
-        if not vid:
-            if item not in ordered:
-                ordered.append(item)
-                appended += 1
-            continue
-        if vid in existing_index:
-            continue
-        existing_index[vid] = item
-        ordered.append(item)
-        appended += 1
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(ordered, f, ensure_ascii=False, indent=2)
-    log_func(f"✓ Merged results (added {appended}) into youtube_results.json", "green")
-
-
-def read_urls_from_file(file_path: str, log_func: Callable[[str, Optional[str]], None]) -> Optional[List[str]]:
-    """Read URLs from text file"""
-    urls = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for ln, line in enumerate(f, 1):
-                s = line.strip()
-                if s and not s.startswith('#'):
-                    if extract_video_id(s):
-                        urls.append(s)
-                    else:
-                        log_func(f"Line {ln}: Invalid URL - {s}", "yellow")
-    except Exception as e:
-        log_func(f"Error reading file: {e}", "red")
-        return None
-    return urls
-
-
-def sanitize_filename(title: str) -> str:
-    """Sanitizes a string to be used as a filename."""
-    # Remove characters that are illegal in Windows/Unix filenames
-    # This pattern covers: \ / : * ? " < > |
-    cleaned_title = re.sub(r'[\\/:*?"<>|]', '', title)
-    # Replace multiple spaces with a single underscore, and leading/trailing spaces
-    cleaned_title = re.sub(r'\s+', '_', cleaned_title).strip('_')
-    # Limit length to avoid extremely long filenames, common limit is 255 but 100-150 is safer
-    if len(cleaned_title) > 100:
-        cleaned_title = cleaned_title[:100]
-    return cleaned_title
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, List, Tuple
+
+from ebs_pipeline_core import (
+    MAX_WORKERS,
+    YTDLP_AVAILABLE,
+    PipelineConfig,
+    PipelineEngine,
+    UrlList,
+    format_stats,
+    is_supported_url,
+    iter_urls_from_file,
+    log_to_file,
+    open_file_log,
+    prewarm_yt_dlp,
+    url_key,
+)
+
+
+# ====== URL Queue View ======
+QUEUE_STATUS_COLORS = {
+    'queued': '#7a8896',
+    'cached': '#4da6ff',
+    'running': '#ffa500',
+    'done': '#00ff9f',
+    'failed': '#ff4757',
+}
+
+
+class UrlQueueView:
+    """Windowed list of queued URLs with a per-URL status column.
+
+    Only the rows that fit in the textbox are ever inserted into it; the rest
+    live in plain lists. Appending URLs or changing a status redraws at most
+    one screenful, so the cost does not grow with the length of the queue.
+    """
+
+    def __init__(self, master, colors: Dict[str, str], height: int = 100):
+        self.frame = ctk.CTkFrame(master, fg_color="transparent")
+        self.textbox = ctk.CTkTextbox(
+            self.frame,
+            height=height,
+            fg_color=colors['bg'],
+            text_color=colors['text_dim'],
+            wrap="none",
+            activate_scrollbars=False,
+            state="disabled"
+        )
+        self.textbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self.frame, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        for status, color in QUEUE_STATUS_COLORS.items():
+            self.textbox.tag_config(status, foreground=color)
+
+        self.urls: List[str] = []
+        self.statuses: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.top = 0
+        self._line_height = max(1, ctk.CTkFont().metrics("linespace"))
+        self.visible_rows = max(1, height // self._line_height)
+        self.textbox.bind("<Configure>", self._on_resize)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.textbox.bind(sequence, self._on_wheel)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def load(self, urls: Iterable[str]):
+        """Replaces every row; all statuses go back to 'queued'"""
+        self.urls = list(urls)
+        self.statuses = ['queued'] * len(self.urls)
+        self._rows = {url_key(url): i for i, url in enumerate(self.urls)}
+        self.top = 0
+        self._render()
+
+    def extend(self, urls: Iterable[str], status: str = 'queued'):
+        first = len(self.urls)
+        for url in urls:
+            self._rows.setdefault(url_key(url), len(self.urls))
+            self.urls.append(url)
+            self.statuses.append(status)
+        if first < self.top + self.visible_rows:
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def set_statuses(self, statuses: Dict[str, str]):
+        """Applies {url: status}; URLs not in the list (e.g. from a playlist) are appended"""
+        redraw = False
+        new_rows = {}
+        for url, status in statuses.items():
+            i = self._rows.get(url_key(url))
+            if i is None:
+                new_rows[url] = status
+                continue
+            self.statuses[i] = status
+            redraw = redraw or self.top <= i < self.top + self.visible_rows
+        for url, status in new_rows.items():
+            self.extend([url], status)
+        if redraw:
+            self._render()
+
+    def scroll_to(self, top: int):
+        top = max(0, min(top, len(self.urls) - self.visible_rows))
+        if top != self.top:
+            self.top = top
+            self._render()
+
+    def _render(self):
+        end = min(len(self.urls), self.top + self.visible_rows)
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        for i in range(self.top, end):
+            status = self.statuses[i]
+            self.textbox.insert("end", f"{i + 1:>6}  {status:<8} ", status)
+            self.textbox.insert("end", f"{self.urls[i]}\n")
+        self.textbox.configure(state="disabled")
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.urls)
+        if total <= self.visible_rows:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.top / total, (self.top + self.visible_rows) / total)
+
+    def _on_scrollbar(self, action: str, *args):
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * len(self.urls)))
+        elif action == 'scroll':
+            step = int(args[0]) * (self.visible_rows if args[1] == 'pages' else 1)
+            self.scroll_to(self.top + step)
+
+    def _on_wheel(self, event):
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self.scroll_to(self.top + step)
+        return "break"
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self._line_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.top = max(0, min(self.top, len(self.urls) - rows))
+            self._render()
+
+
+# ====== Log Panel ======
+class LogPanelSink:
+    """Thread-safe, bounded log sink for the log textbox.
+
+    write() only appends to a deque (and the rotating file log), so worker
+    threads never touch Tk. The Tk thread drains the deque every
+    `interval_ms`, inserting each run of same-colored lines at once, and
+    trims the textbox to its last `max_lines` lines. If more than
+    `max_lines` messages pile up between drains, the oldest are dropped from
+    the panel with a note; the file log still has them.
+    """
+
+    TAGS = {'red': 'red_tag', 'yellow': 'yellow_tag', 'green': 'green_tag', 'blue': 'blue_tag'}
+
+    def __init__(self, root, textbox, colors: Dict[str, str], max_lines: int = 5000, interval_ms: int = 100,
+                 file_log_path: Optional[str] = 'ebs_pipeline.log'):
+        self.root = root
+        self.textbox = textbox
+        self.max_lines = max_lines
+        self.interval_ms = interval_ms
+        self._pending: Deque[Tuple[str, Optional[str]]] = deque()
+        self._lock = threading.Lock()
+        self._dropped = 0
+        self._line_count = 0
+        self.file_log = None
+        if file_log_path:
+            try:
+                self.file_log = open_file_log(file_log_path)
+            except OSError:
+                pass  # no writable working directory; the panel still works
+        for color, tag in (('red', 'error'), ('yellow', 'warning'), ('green', 'success'), ('blue', 'accent')):
+            self.textbox.tag_config(self.TAGS[color], foreground=colors[tag])
+
+    def start(self):
+        self.root.after(self.interval_ms, self._drain)
+
+    def write(self, message: str, color: Optional[str] = None):
+        if self.file_log is not None:
+            log_to_file(self.file_log, message, color)
+        with self._lock:
+            if len(self._pending) >= self.max_lines:
+                self._pending.popleft()
+                self._dropped += 1
+            self._pending.append((message, color))
+
+    def _drain(self):
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, deque()
+                dropped, self._dropped = self._dropped, 0
+            if pending or dropped:
+                self._insert(pending, dropped)
+        finally:
+            self.root.after(self.interval_ms, self._drain)
+
+    def _insert(self, pending: Deque[Tuple[str, Optional[str]]], dropped: int):
+        runs: List[Tuple[List[str], Optional[str]]] = []
+        if dropped:
+            runs.append(([f"... {dropped} log lines skipped here (see the log file) ..."], 'yellow'))
+        for message, color in pending:
+            if runs and runs[-1][1] == color:
+                runs[-1][0].append(message)
+            else:
+                runs.append(([message], color))
+        self.textbox.configure(state="normal")
+        for messages, color in runs:
+            text = "\n".join(messages) + "\n"
+            self._line_count += text.count("\n")
+            self.textbox.insert("end", text, self.TAGS.get(color))
+        excess = self._line_count - self.max_lines
+        if excess > 0:
+            self.textbox.delete("1.0", f"{excess + 1}.0")
+            self._line_count -= excess
+        self.textbox.see("end")
+        self.textbox.configure(state="disabled")
 
 
 # ====== GUI Class ======
@@ -258,15 +259,22 @@ class EBSToolPackGUI:
         self.root.configure(fg_color=self.colors['bg'])
 
         # State variables
-        self.urls_to_process: List[str] = []
+        self.urls_to_process = UrlList()
+        self.url_import_thread: Optional[threading.Thread] = None
+        self._import_added = 0
+        self._status_lock = threading.Lock()
+        self._pending_statuses: Dict[str, str] = {}
         self.pipeline_running = False
+        self.stop_event = threading.Event()
         self.stop_pipeline_flag = False
         self.use_title_for_subtitle_filename = ctk.BooleanVar(value=False)  # New state variable
 
         # NEW: Rate Limit State Variables
         self.rate_limit_enabled = ctk.BooleanVar(value=True)  # Default: Rate limit is ON
+        self.use_processes = ctk.BooleanVar(value=False)  # Run yt-dlp in worker processes instead of threads
         self.min_wait_entry: Optional[ctk.CTkEntry] = None
         self.max_wait_entry: Optional[ctk.CTkEntry] = None
+        self.burst_entry: Optional[ctk.CTkEntry] = None
 
         # Main container
         self.main_container = ctk.CTkFrame(self.root, fg_color=self.colors['bg'])
@@ -274,6 +282,18 @@ class EBSToolPackGUI:
 
         self._setup_ui()
 
+    @property
+    def stop_pipeline_flag(self) -> bool:
+        return self.stop_event.is_set()
+
+    @stop_pipeline_flag.setter
+    def stop_pipeline_flag(self, value: bool):
+        # Backed by an Event so rate-limit waits wake up as soon as Cancel is pressed
+        if value:
+            self.stop_event.set()
+        else:
+            self.stop_event.clear()
+
     def _setup_ui(self):
         self.clear_screen()
 
@@ -342,7 +362,18 @@ class EBSToolPackGUI:
             border_color=self.colors['accent']
         )
         self.max_wait_entry.insert(0, "25") # Default max wait time
-        self.max_wait_entry.pack(fill="x", pady=(0, 10))
+        self.max_wait_entry.pack(fill="x", pady=(0, 5))
+
+        ctk.CTkLabel(rate_limit_frame, text="Burst (videos allowed back-to-back):",
+                     text_color=self.colors['text']).pack(anchor="w", pady=(0, 0))
+        self.burst_entry = ctk.CTkEntry(
+            rate_limit_frame,
+            placeholder_text="1",
+            fg_color=self.colors['bg'],
+            border_color=self.colors['accent']
+        )
+        self.burst_entry.insert(0, "1")
+        self.burst_entry.pack(fill="x", pady=(0, 10))
         self._toggle_rate_limit_inputs() # Set initial state based on checkbox
 
         # URL Input Section
@@ -385,15 +416,8 @@ class EBSToolPackGUI:
 
         ctk.CTkLabel(input_panel, text="URLs to process:", text_color=self.colors['text']).pack(
             anchor="w", padx=15, pady=(10, 0))
-        self.url_list_textbox = ctk.CTkTextbox(
-            input_panel,
-            height=100,
-            fg_color=self.colors['bg'],
-            text_color=self.colors['text_dim'],
-            wrap="word",
-            state="disabled"
-        )
-        self.url_list_textbox.pack(fill="x", padx=15, pady=(0, 10))
+        self.url_queue_view = UrlQueueView(input_panel, self.colors, height=100)
+        self.url_queue_view.pack(fill="x", padx=15, pady=(0, 10))
 
         url_list_buttons_frame = ctk.CTkFrame(input_panel, fg_color="transparent")
         url_list_buttons_frame.pack(fill="x", padx=15, pady=(0, 10))
@@ -525,7 +549,7 @@ class EBSToolPackGUI:
         # NEW: Subtitle Language and Cookie Options
         self._add_input_section(input_panel, "Extraction Options")
 
-        ctk.CTkLabel(input_panel, text="Subtitle Language (e.g., 'en', 'vi', 'ko'):",
+        ctk.CTkLabel(input_panel, text="Subtitle Language(s) (e.g., 'en' or 'en, vi, ko'):",
                      text_color=self.colors['text']).pack(anchor="w", padx=15, pady=(10, 0))
         self.subtitle_lang_entry = ctk.CTkEntry(
             input_panel,
@@ -559,6 +583,28 @@ class EBSToolPackGUI:
         )
         self.browse_cookie_file_button.pack(side="left")
 
+        workers_frame = ctk.CTkFrame(input_panel, fg_color="transparent")
+        workers_frame.pack(fill="x", padx=15, pady=(10, 0))
+        ctk.CTkLabel(workers_frame, text="Parallel workers (1 = sequential):",
+                     text_color=self.colors['text']).pack(side="left", anchor="w")
+        self.use_processes_checkbox = ctk.CTkCheckBox(
+            workers_frame,
+            text="Use processes",
+            variable=self.use_processes,
+            text_color=self.colors['text_dim'],
+            hover_color=self.colors['accent_hover'],
+            fg_color=self.colors['accent']
+        )
+        self.use_processes_checkbox.pack(side="right", anchor="e", padx=(10, 0))
+        self.workers_entry = ctk.CTkEntry(
+            input_panel,
+            placeholder_text="1",
+            fg_color=self.colors['bg'],
+            border_color=self.colors['accent']
+        )
+        self.workers_entry.insert(0, "1")
+        self.workers_entry.pack(fill="x", padx=15, pady=(0, 10))
+
         # Start Button
         self.start_button = ctk.CTkButton(
             input_panel,
@@ -591,6 +637,15 @@ class EBSToolPackGUI:
         self.pipeline_progress_bar.pack(fill="x", padx=15, pady=(0, 10))
         self.pipeline_progress_bar.set(0)
 
+        self.stats_label = ctk.CTkLabel(
+            log_panel,
+            text="",
+            text_color=self.colors['text_dim'],
+            font=ctk.CTkFont(size=12),
+            justify="left"
+        )
+        self.stats_label.pack(anchor="w", padx=15, pady=(0, 5))
+
         ctk.CTkLabel(log_panel, text="Detailed Log:", font=ctk.CTkFont(size=14, weight="bold"),
                      text_color=self.colors['text']).pack(anchor="w", padx=15, pady=(10, 0))
 
@@ -603,6 +658,8 @@ class EBSToolPackGUI:
             height=300
         )
         self.log_textbox.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+        self.log_sink = LogPanelSink(self.root, self.log_textbox, self.colors)
+        self.log_sink.start()
 
         # Cancel button
         self.cancel_button = ctk.CTkButton(
@@ -637,56 +694,56 @@ class EBSToolPackGUI:
             widget.destroy()
 
     def gui_log_output(self, message: str, color_tag: Optional[str] = None):
-        """Thread-safe logging to the GUI textbox"""
-        self.root.after(0, lambda: self._append_log(message, color_tag))
-
-    def _append_log(self, message: str, color: Optional[str] = None):
-        """Appends a message to the log textbox"""
-        self.log_textbox.configure(state="normal")
-        if color == "red":
-            self.log_textbox.insert("end", f"{message}\n", "red_tag")
-            self.log_textbox.tag_config("red_tag", foreground=self.colors['error'])
-        elif color == "yellow":
-            self.log_textbox.insert("end", f"{message}\n", "yellow_tag")
-            self.log_textbox.tag_config("yellow_tag", foreground=self.colors['warning'])
-        elif color == "green":
-            self.log_textbox.insert("end", f"{message}\n", "green_tag")
-            self.log_textbox.tag_config("green_tag", foreground=self.colors['success'])
-        elif color == "blue":
-            self.log_textbox.insert("end", f"{message}\n", "blue_tag")
-            self.log_textbox.tag_config("blue_tag", foreground=self.colors['accent'])
-        else:
-            self.log_textbox.insert("end", f"{message}\n")
-        self.log_textbox.see("end")
-        self.log_textbox.configure(state="disabled")
+        """Thread-safe logging to the GUI textbox (batched) and the rotating log file"""
+        self.log_sink.write(message, color_tag)
 
     def _update_url_list_display(self):
-        """Updates the URL list textbox and count label"""
-        self.url_list_textbox.configure(state="normal")
-        self.url_list_textbox.delete("1.0", "end")
-        for url in self.urls_to_process:
-            self.url_list_textbox.insert("end", f"{url}\n")
-        self.url_list_textbox.configure(state="disabled")
-        self.url_count_label.configure(text=f"Total URLs: {len(self.urls_to_process)}")
+        """Reloads the URL queue view from the queue and updates the count label"""
+        self.url_queue_view.load(self.urls_to_process)
+        self._refresh_url_count()
+
+    def _append_url_lines(self, urls: List[str]):
+        """Adds newly queued URLs to the queue view"""
+        if urls:
+            self.url_queue_view.extend(urls)
+
+    def _post_url_status(self, url: str, status: str):
+        """Called from worker threads; coalesces status changes into one Tk callback"""
+        with self._status_lock:
+            schedule = not self._pending_statuses
+            self._pending_statuses[url] = status
+        if schedule:
+            self.root.after(50, self._flush_url_statuses)
+
+    def _flush_url_statuses(self):
+        with self._status_lock:
+            pending, self._pending_statuses = self._pending_statuses, {}
+        self.url_queue_view.set_statuses(pending)
+
+    def _refresh_url_count(self, suffix: str = ""):
+        self.url_count_label.configure(text=f"Total URLs: {len(self.urls_to_process)}{suffix}")
         self._update_end_num_label()
 
     def _add_single_url(self):
         url = self.single_url_entry.get().strip()
         if url:
-            if extract_video_id(url):
-                if url not in self.urls_to_process:
-                    self.urls_to_process.append(url)
+            if is_supported_url(url):
+                if self.urls_to_process.add(url):
                     self.single_url_entry.delete(0, "end")
                     self.gui_log_output(f"Added URL: {url}", "blue")
-                    self._update_url_list_display()
+                    self._append_url_lines([url])
+                    self._refresh_url_count()
                 else:
-                    messagebox.showinfo("Duplicate URL", "This URL is already in the list.")
+                    messagebox.showinfo("Duplicate URL", "This video is already in the list.")
             else:
-                messagebox.showerror("Invalid URL", "Please enter a valid YouTube URL.")
+                messagebox.showerror("Invalid URL", "Please enter a valid YouTube video, playlist or channel URL.")
         else:
             messagebox.showwarning("Empty URL", "Please enter a URL before clicking 'Add URL'.")
 
     def _browse_urls_file(self):
+        if self.url_import_thread is not None:
+            messagebox.showinfo("Import running", "A URL file is still being imported.")
+            return
         file_path = filedialog.askopenfilename(
             parent=self.root,
             title="Select .txt file with YouTube URLs",
@@ -694,24 +751,56 @@ class EBSToolPackGUI:
             initialdir=os.path.expanduser("~")
         )
         if file_path:
-            urls = read_urls_from_file(file_path, self.gui_log_output)
-            if urls:
-                new_urls_added = 0
-                for url in urls:
-                    if url not in self.urls_to_process:
-                        self.urls_to_process.append(url)
-                        new_urls_added += 1
-                self.gui_log_output(
-                    f"Loaded {len(urls)} URLs from '{os.path.basename(file_path)}'. Added {new_urls_added} new URLs.",
-                    "green")
-                self.root.after(0, self._update_url_list_display)
-            else:
-                messagebox.showwarning("No valid URLs",
-                                       f"No valid YouTube URLs found in '{os.path.basename(file_path)}'.")
+            # Large files are read on a worker thread so the window stays responsive
+            self._import_added = 0
+            self.browse_url_file_button.configure(state="disabled", text="Importing...")
+            self.url_import_thread = threading.Thread(target=self._import_urls_file, args=(file_path,),
+                                                      daemon=True)
+            self.url_import_thread.start()
+
+    def _import_urls_file(self, file_path: str):
+        """Runs on the import thread; hands batches of URLs to the Tk thread as the file is read"""
+        batch: List[str] = []
+        read = 0
+
+        def report(done: int, total: int):
+            nonlocal batch
+            pending, batch = batch, []
+            self.root.after(0, self._merge_imported_urls, pending, done, total)
+
+        try:
+            for url in iter_urls_from_file(file_path, self.gui_log_output, report):
+                batch.append(url)
+                read += 1
+        except Exception as e:
+            self.gui_log_output(f"Error reading file: {e}", "red")
+        self.root.after(0, self._finish_url_import, os.path.basename(file_path), batch, read)
+
+    def _merge_imported_urls(self, urls: List[str], done: int, total: int):
+        added = [url for url in urls if self.urls_to_process.add(url)]
+        self._import_added += len(added)
+        self._append_url_lines(added)
+        percent = done * 100 // total if total else 100
+        self._refresh_url_count(f" (importing {percent}%)")
+
+    def _finish_url_import(self, file_name: str, urls: List[str], read: int):
+        self._merge_imported_urls(urls, 1, 1)
+        self._refresh_url_count()
+        self.url_import_thread = None
+        self.browse_url_file_button.configure(state="disabled" if self.pipeline_running else "normal",
+                                              text="Browse .txt file")
+        if read:
+            self.gui_log_output(
+                f"Loaded {read} URLs from '{file_name}'. Added {self._import_added} new URLs.", "green")
+        else:
+            messagebox.showwarning("No valid URLs", f"No valid YouTube URLs found in '{file_name}'.")
 
     def _clear_urls(self):
+        if self.url_import_thread is not None:
+            messagebox.showinfo("Import running", "Wait for the URL file import to finish before clearing.")
+            return
         if messagebox.askyesno("Clear URLs", "Are you sure you want to clear all URLs from the list?"):
-            self.urls_to_process = []
+            self.urls_to_process.clear()
             self.gui_log_output("All URLs cleared.", "yellow")
             self._update_url_list_display()
 
@@ -760,6 +849,8 @@ class EBSToolPackGUI:
             self.min_wait_entry.configure(state=state)
         if self.max_wait_entry:
             self.max_wait_entry.configure(state=state)
+        if self.burst_entry:
+            self.burst_entry.configure(state=state)
 
     def _update_end_num_label(self, event=None):
         try:
@@ -768,6 +859,8 @@ class EBSToolPackGUI:
             end_num = start_num + num_urls - 1
             if num_urls == 0:
                 self.end_num_label.configure(text="End number: (0 URLs selected)")
+            elif self.urls_to_process.collection_count:
+                self.end_num_label.configure(text="End number: known once playlists/channels are listed")
             else:
                 raw_pad_width = self.pad_width_entry.get().strip()
                 try:
@@ -800,11 +893,9 @@ class EBSToolPackGUI:
 
         raw_pad_width = self.pad_width_entry.get().strip()
         try:
-            pad_width = int(raw_pad_width) if raw_pad_width else 0
-            if pad_width <= 0:
-                pad_width = max(1, len(str(start_num + len(self.urls_to_process) - 1)))
+            pad_width = max(0, int(raw_pad_width) if raw_pad_width else 0)
         except ValueError:
-            pad_width = max(1, len(str(start_num + len(self.urls_to_process) - 1)))
+            pad_width = 0  # PipelineConfig picks a width that fits the largest number
 
         dest_dir = self.dest_dir_entry.get().strip()
         if not dest_dir:
@@ -832,22 +923,34 @@ class EBSToolPackGUI:
 
         # NEW: Get Rate Limit Configuration
         rate_limit_enabled = self.rate_limit_enabled.get()
-        min_wait_time = 0
-        max_wait_time = 0
+        min_wait_time, max_wait_time, burst = 0, 0, 1
         if rate_limit_enabled:
             try:
                 min_wait_time = int(self.min_wait_entry.get())
                 max_wait_time = int(self.max_wait_entry.get())
+                burst = int(self.burst_entry.get().strip() or "1")
                 if min_wait_time < 0 or max_wait_time < 0:
                     messagebox.showerror("Invalid Rate Limit", "Min/Max wait times cannot be negative.")
                     return
                 if min_wait_time > max_wait_time:
                     messagebox.showerror("Invalid Rate Limit", "Min wait time cannot be greater than Max wait time.")
                     return
+                if burst < 1:
+                    messagebox.showerror("Invalid Rate Limit", "Burst must be at least 1.")
+                    return
             except ValueError:
-                messagebox.showerror("Invalid Rate Limit", "Min/Max wait times must be integers.")
+                messagebox.showerror("Invalid Rate Limit", "Min/Max wait times and burst must be integers.")
                 return
 
+        try:
+            num_workers = int(self.workers_entry.get().strip() or "1")
+        except ValueError:
+            messagebox.showerror("Invalid input", "Parallel workers must be an integer.")
+            return
+        if not 1 <= num_workers <= MAX_WORKERS:
+            messagebox.showerror("Invalid input", f"Parallel workers must be between 1 and {MAX_WORKERS}.")
+            return
+
         if not os.path.exists(dest_dir):
             try:
                 os.makedirs(dest_dir, exist_ok=True)
@@ -860,6 +963,10 @@ class EBSToolPackGUI:
             messagebox.showwarning("No URLs", "Please add at least one YouTube URL to process.")
             return
 
+        if self.url_import_thread is not None:
+            messagebox.showwarning("Import running", "Wait for the URL file import to finish.")
+            return
+
         if not YTDLP_AVAILABLE:
             if not messagebox.askyesno("yt-dlp missing",
                                        "yt-dlp is not installed. Subtitle extraction will fail. Continue anyway?"):
@@ -867,15 +974,30 @@ class EBSToolPackGUI:
             self.gui_log_output("yt-dlp not available. Extraction will be skipped.", "yellow")
 
         self._toggle_ui_state(False)
+        self._update_url_list_display()  # every row back to 'queued'
         self.stop_pipeline_flag = False
         self.pipeline_running = True
         self.gui_log_output("Pipeline started!", "blue")
 
-        threading.Thread(target=self._run_pipeline,
-                         args=(start_num, pad_width, dest_dir, folder_prefix, subtitle_file_prefix,
-                               content_file_prefix, selected_lang, cookie_file_path,
-                               rate_limit_enabled, min_wait_time, max_wait_time),  # Pass new args
-                         daemon=True).start()
+        config = PipelineConfig(
+            urls=list(self.urls_to_process),
+            dest_dir=dest_dir,
+            start_num=start_num,
+            pad_width=pad_width,
+            folder_prefix=folder_prefix,
+            subtitle_file_prefix=subtitle_file_prefix,
+            content_file_prefix=content_file_prefix,
+            use_title=self.use_title_for_subtitle_filename.get(),
+            selected_lang=selected_lang,
+            cookie_file_path=cookie_file_path or None,
+            rate_limit_enabled=rate_limit_enabled,
+            min_wait_time=min_wait_time,
+            max_wait_time=max_wait_time,
+            burst=burst,
+            num_workers=num_workers,
+            use_processes=self.use_processes.get(),
+        )
+        threading.Thread(target=self._run_pipeline, args=(config,), daemon=True).start()
 
     def _toggle_ui_state(self, enable: bool):
         """Enable/disable input widgets and buttons"""
@@ -896,6 +1018,8 @@ class EBSToolPackGUI:
         # NEW: toggle new widgets
         self.subtitle_lang_entry.configure(state=state)
         self.cookie_file_entry.configure(state=state)
+        self.workers_entry.configure(state=state)
+        self.use_processes_checkbox.configure(state=state)
 
         self.start_button.configure(state=state)
         self.add_url_button.configure(state=state)
@@ -912,9 +1036,11 @@ class EBSToolPackGUI:
         if enable and self.rate_limit_enabled.get():
             self.min_wait_entry.configure(state="normal")
             self.max_wait_entry.configure(state="normal")
+            self.burst_entry.configure(state="normal")
         else:
             self.min_wait_entry.configure(state="disabled")
             self.max_wait_entry.configure(state="disabled")
+            self.burst_entry.configure(state="disabled")
 
 
         self.cancel_button.configure(state="normal" if not enable else "disabled")
@@ -924,7 +1050,7 @@ class EBSToolPackGUI:
     def _cancel_pipeline(self):
         if messagebox.askyesno("Cancel Pipeline", "Are you sure you want to stop the current pipeline?"):
             self.stop_pipeline_flag = True
-            self.gui_log_output("Cancel requested. Waiting for current step to complete...", "yellow")
+            self.gui_log_output("Cancel requested. Abandoning running extractions...", "yellow")
             self.cancel_button.configure(state="disabled", text="Stopping...")
 
     def _update_progress_gui(self, current: int, total: int, description: str):
@@ -935,140 +1061,20 @@ class EBSToolPackGUI:
         else:
             self.root.after(0, lambda: self.pipeline_progress_bar.set(0))
 
-    # MODIFIED: _run_pipeline to accept rate_limit_enabled, min_wait_time, max_wait_time
-    def _run_pipeline(self, start_num: int, pad_width: int, dest_dir: str,
-                      folder_prefix: str, subtitle_file_prefix: str, content_file_prefix: str,
-                      selected_lang: str, cookie_file_path: Optional[str],
-                      rate_limit_enabled: bool, min_wait_time: int, max_wait_time: int):
-        try:
-            self.gui_log_output("\n--- Starting YouTube Subtitle Extraction ---", "blue")
-            self._update_progress_gui(0, len(self.urls_to_process), "Preparing...")
-
-            results: List[Dict[str, Any]] = []
-            total_urls = len(self.urls_to_process)
-
-            # Process each URL
-            for i, url in enumerate(self.urls_to_process):
-                if self.stop_pipeline_flag:
-                    self.gui_log_output("Pipeline cancelled during extraction.", "red")
-                    return
-
-                self._update_progress_gui(i, total_urls, f"Processing video {i + 1}/{total_urls}: {url}")
-                self.gui_log_output(f"Processing URL: {url}")
-
-                vid = extract_video_id(url)
-                existing_index, _ = load_existing_index('youtube_results.json')
-
-                r = None  # Initialize r
-                if vid and vid in existing_index:
-                    cached_item = existing_index[vid]
-                    # If cached result looks like it has content and was successful, use it.
-                    # Otherwise, re-extract for the current selected_lang.
-                    # We also re-extract if the current language doesn't match the cached one,
-                    # or if the user wants to use title for filename and we don't have title.
-                    if cached_item.get('status') == 'success' and \
-                            not cached_item.get('subtitles', '').startswith("No ") and \
-                            not cached_item.get('subtitles', '').startswith("Error downloading") and \
-                            cached_item.get('extracted_lang') == selected_lang and \
-                            (not self.use_title_for_subtitle_filename.get() or cached_item.get('title')):
-                        r = cached_item
-                        r.setdefault('url', url)  # Ensure url is present
-                        self.gui_log_output(f"↷ Using cached result for: {url}", "blue")
-                    else:
-                        self.gui_log_output(
-                            f"Cached result for {url} needs re-extraction (lang/title mismatch or error).", "yellow")
-                        r = get_video_info(url, self.gui_log_output, selected_lang, cookie_file_path)
-                        r['extracted_lang'] = selected_lang  # Store the language used for extraction
-                        r.setdefault('url', url)  # Ensure url is present
-                        status_msg = f"{'✓ OK' if r.get('status') == 'success' else '✗ Error'} - {url}"
-                        self.gui_log_output(status_msg, "green" if r.get('status') == 'success' else "red")
-                else:
-                    r = get_video_info(url, self.gui_log_output, selected_lang, cookie_file_path)  # Pass new args
-                    r['extracted_lang'] = selected_lang  # Store the language used for extraction
-                    status_msg = f"{'✓ OK' if r.get('status') == 'success' else '✗ Error'} - {url}"
-                    self.gui_log_output(status_msg, "green" if r.get('status') == 'success' else "red")
-
-                if r:  # Make sure r is not None before appending
-                    results.append(r)
-
-                # NEW: Apply Rate Limit if enabled
-                if rate_limit_enabled and i < total_urls - 1 and not self.stop_pipeline_flag:
-                    wait_time = random.randint(min_wait_time, max_wait_time)
-                    self.gui_log_output(f"⏳ Waiting {wait_time} seconds before next video.", "yellow")
-                    time.sleep(wait_time)
-                elif not rate_limit_enabled and i < total_urls - 1:
-                    self.gui_log_output("Rate limit is disabled. Proceeding to next video without delay.", "blue")
-
-
-            self._update_progress_gui(total_urls, total_urls, "Completed extraction.")
-            save_results_merge(results, self.gui_log_output)
-            self.gui_log_output("✓ Completed subtitle extraction.", "green")
-
-            # Save subtitle files
-            self.gui_log_output("\n--- Saving Subtitle Files ---", "blue")
-            saved_count = 0
-
-            for idx, r in enumerate(results):
-                if self.stop_pipeline_flag:
-                    self.gui_log_output("Pipeline cancelled during file saving.", "red")
-                    return
-
-                file_num = start_num + idx
-                numbered_suffix = f"{file_num:0{pad_width}d}"
-
-                current_video_folder = os.path.join(dest_dir, f"{folder_prefix}{numbered_suffix}")
-                os.makedirs(current_video_folder, exist_ok=True)
-                self.gui_log_output(f"Created folder: {current_video_folder}", "blue")
-
-                # Determine subtitle filename based on checkbox state
-                if self.use_title_for_subtitle_filename.get():
-                    video_title = r.get('title', 'Unknown_Video_Title')
-                    cleaned_title = sanitize_filename(video_title)
-                    subtitle_filename = f"{numbered_suffix}. {cleaned_title}.txt"
-                else:
-                    subtitle_filename = f"{subtitle_file_prefix}{numbered_suffix}.txt"
-
-                subtitle_filepath = os.path.join(current_video_folder, subtitle_filename)
-
-                # Content file (empty)
-                content_filename = f"{content_file_prefix}{numbered_suffix}.txt"
-                content_filepath = os.path.join(current_video_folder, content_filename)
-
-                if r.get('status') != 'success':
-                    error_msg = r.get('error', 'Unknown error')
-                    with open(subtitle_filepath, 'w', encoding='utf-8') as f:
-                        f.write(f"ERROR: {error_msg}\n")
-                        f.write(f"URL: {r.get('url', 'N/A')}\n")
-                    self.gui_log_output(
-                        f"⚠ Saved error note for {subtitle_filename} in {os.path.basename(current_video_folder)}",
-                        "yellow")
-                else:
-                    subtitle_content = r.get('subtitles',
-                                             f'No {selected_lang} subtitles available')  # Use selected_lang in default message
-                    try:
-                        with open(subtitle_filepath, 'w', encoding='utf-8') as f:
-                            f.write(subtitle_content)
-                        saved_count += 1
-                        self.gui_log_output(f"✓ Saved subtitle: {subtitle_filename} - {r.get('title', 'Unknown')}",
-                                            "green")
-                    except Exception as e:
-                        self.gui_log_output(f"✗ Error saving subtitle {subtitle_filename}: {e}", "red")
-
-                try:
-                    with open(content_filepath, 'w', encoding='utf-8') as f:
-                        f.write("")
-                    self.gui_log_output(f"✓ Created empty content file: {content_filename}", "green")
-                except Exception as e:
-                    self.gui_log_output(f"✗ Error creating content file {content_filename}: {e}", "red")
-
-                self._update_progress_gui(idx + 1, len(results), f"Saving files for video {idx + 1}/{len(results)}")
-
-            self.gui_log_output(
-                f"\n→ Successfully processed {saved_count}/{len(results)} videos with files saved to subfolders under: {dest_dir}",
-                "green")
-            messagebox.showinfo("Pipeline Complete",
-                                f"Successfully processed {saved_count} videos!\n\nOutput root: {dest_dir}")
+    def _update_stats_gui(self, snapshot: Dict[str, Any]):
+        """Called from the pipeline thread after every video"""
+        self.root.after(0, lambda: self.stats_label.configure(text=format_stats(snapshot)))
 
+    def _run_pipeline(self, config: PipelineConfig):
+        try:
+            engine = PipelineEngine(config, self.gui_log_output, self._update_progress_gui,
+                                    stop_event=self.stop_event, status_func=self._post_url_status,
+                                    stats_func=self._update_stats_gui)
+            summary = engine.run()
+            if not summary['cancelled']:
+                messagebox.showinfo("Pipeline Complete",
+                                    f"Successfully processed {summary['saved']} videos!\n\n"
+                                    f"Output root: {config.dest_dir}")
         except Exception as e:
             error_msg = f"Critical error occurred: {e}"
             self.gui_log_output(error_msg, "red")
@@ -1082,9 +1088,12 @@ class EBSToolPackGUI:
             self.root.after(0, lambda: self.cancel_button.configure(text="Cancel"))
 
     def run(self):
+        # Import yt-dlp in the background once the window is up instead of before it appears
+        self.root.after(200, prewarm_yt_dlp)
         self.root.mainloop()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # process-pool workers in frozen (PyInstaller) builds
     app = EBSToolPackGUI()
     app.run()